@@ -6,25 +6,18 @@ import sys
 
 def create_branch(branch_name: str) -> None:
     """Создает новую Git ветку и переключается на неё."""
+    # git пишет вывод напрямую в терминал, без перехвата в буферы
     try:
-        result = subprocess.run(
-            ['git', 'checkout', '-b', branch_name],
-            capture_output=True,
-            text=True,
-            encoding='utf-8'
-        )
-        
-        if result.returncode == 0:
-            print(f'Ветка "{branch_name}" успешно создана и активирована.')
-            print(result.stdout)
-        else:
-            print(f'Ошибка при создании ветки: {result.stderr}')
-            sys.exit(1)
-    except Exception as e:
-        print(f'Ошибка: {e}')
+        result = subprocess.run(['git', 'checkout', '-b', branch_name])
+    except OSError as e:
+        print(f'Ошибка запуска git: {e}')
         sys.exit(1)
 
+    if result.returncode != 0:
+        print(f'Ошибка при создании ветки "{branch_name}".')
+        sys.exit(result.returncode)
+    print(f'Ветка "{branch_name}" успешно создана и активирована.')
+
 if __name__ == '__main__':
     branch_name = 'доработки'
     create_branch(branch_name)
-
@@ -2,6 +2,7 @@ import logging
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import BotCommand
@@ -11,6 +12,7 @@ from src.bot.router import get_router
 from src.core.config import load_config
 from src.core.logging import setup_logging
 from src.core.storage import Storage
+from src.core.write_buffer import AsyncWriteBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +32,12 @@ async def main() -> None:
 	logger.info(f"Starting Telegram Audio Transcriber (env: {config.env})")
 	logger.info(f"Provider: {config.provider.default}, Fallback: {config.provider.fallback}")
 
+	# One pooled aiohttp session serves all API calls and file downloads,
+	# so keep-alive connections to the Bot API host are reused
+	session = AiohttpSession(limit=config.telegram.connection_limit)
 	bot = Bot(
 		token=config.telegram_token,
+		session=session,
 		default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 	)
 	
@@ -43,8 +49,9 @@ async def main() -> None:
 	
 	# Setup dispatcher with middleware
 	dp = Dispatcher(storage=MemoryStorage())
-	dp.message.middleware(MessageLoggingMiddleware(storage=storage))
-	dp.include_router(get_router(config=config, storage=storage))
+	write_buffer = AsyncWriteBuffer(storage)
+	dp.message.middleware(MessageLoggingMiddleware(write_buffer))
+	dp.include_router(get_router(config=config, storage=storage, write_buffer=write_buffer))
 
 	# Minimal bot commands
 	await bot.set_my_commands(
@@ -56,7 +63,11 @@ async def main() -> None:
 	)
 	logger.info("Bot commands registered")
 	logger.info("Starting polling...")
-	await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+	try:
+		await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+	finally:
+		await write_buffer.close()
+		await session.close()
 
 
 if __name__ == "__main__":
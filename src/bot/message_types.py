@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from aiogram.types import Message
+
+
+@dataclass(frozen=True)
+class MessageInfo:
+	"""Type and attachment details of an incoming message."""
+
+	message_type: str
+	content: str | None = None
+	file_id: str | None = None
+	file_unique_id: str | None = None
+	filename: str | None = None
+	mime_type: str | None = None
+
+
+def _extract_text(text: str, message: Message) -> MessageInfo:
+	message_type = "command" if text.startswith("/") else "text"
+	return MessageInfo(message_type=message_type, content=text)
+
+
+def _extract_voice(voice: Any, message: Message) -> MessageInfo:
+	return MessageInfo(
+		message_type="voice",
+		file_id=voice.file_id,
+		file_unique_id=voice.file_unique_id,
+		filename=f"voice_{voice.file_unique_id}.ogg",
+		mime_type="audio/ogg",
+	)
+
+
+def _extract_audio(audio: Any, message: Message) -> MessageInfo:
+	return MessageInfo(
+		message_type="audio",
+		file_id=audio.file_id,
+		file_unique_id=audio.file_unique_id,
+		filename=audio.file_name or f"audio_{audio.file_unique_id}.mp3",
+		mime_type=audio.mime_type,
+	)
+
+
+def _extract_video(video: Any, message: Message) -> MessageInfo:
+	return MessageInfo(
+		message_type="video",
+		content=message.caption,
+		file_id=video.file_id,
+		file_unique_id=video.file_unique_id,
+		filename=video.file_name or f"video_{video.file_unique_id}.mp4",
+		mime_type=video.mime_type,
+	)
+
+
+def _extract_video_note(video_note: Any, message: Message) -> MessageInfo:
+	return MessageInfo(
+		message_type="video_note",
+		file_id=video_note.file_id,
+		file_unique_id=video_note.file_unique_id,
+		filename=f"videonote_{video_note.file_unique_id}.mp4",
+		mime_type="video/mp4",
+	)
+
+
+def _extract_photo(photo: list[Any], message: Message) -> MessageInfo:
+	# Telegram lists photo sizes in ascending order, the last one is the largest
+	largest_photo = photo[-1]
+	# Telegram stores photos as JPEG; PhotoSize has no file name or path to take it from
+	return MessageInfo(
+		message_type="photo",
+		content=message.caption,
+		file_id=largest_photo.file_id,
+		file_unique_id=largest_photo.file_unique_id,
+		filename=f"photo_{largest_photo.file_unique_id}.jpg",
+		mime_type="image/jpeg",
+	)
+
+
+def _extract_sticker(sticker: Any, message: Message) -> MessageInfo:
+	_, sep, subtype = (sticker.mime_type or "").rpartition("/")
+	ext = subtype if sep else "webp"
+	return MessageInfo(
+		message_type="sticker",
+		file_id=sticker.file_id,
+		file_unique_id=sticker.file_unique_id,
+		filename=f"sticker_{sticker.file_unique_id}.{ext}",
+		mime_type=sticker.mime_type or "image/webp",
+	)
+
+
+def _extract_animation(animation: Any, message: Message) -> MessageInfo:
+	return MessageInfo(
+		message_type="animation",
+		content=message.caption,
+		file_id=animation.file_id,
+		file_unique_id=animation.file_unique_id,
+		filename=animation.file_name or f"animation_{animation.file_unique_id}.gif",
+		mime_type=animation.mime_type or "video/mp4",
+	)
+
+
+def _extract_document(document: Any, message: Message) -> MessageInfo:
+	return MessageInfo(
+		message_type="document",
+		content=message.caption,
+		file_id=document.file_id,
+		file_unique_id=document.file_unique_id,
+		filename=document.file_name or f"doc_{document.file_unique_id}",
+		mime_type=document.mime_type,
+	)
+
+
+# Ordered by how often each type arrives: the first truthy attribute wins.
+# Animation must precede document because Telegram fills both for GIFs.
+_HANDLERS: tuple[tuple[str, Callable[[Any, Message], MessageInfo]], ...] = (
+	("text", _extract_text),
+	("voice", _extract_voice),
+	("audio", _extract_audio),
+	("video", _extract_video),
+	("video_note", _extract_video_note),
+	("photo", _extract_photo),
+	("sticker", _extract_sticker),
+	("animation", _extract_animation),
+	("document", _extract_document),
+)
+
+
+def extract_message_info(message: Message) -> MessageInfo | None:
+	"""Detect message type and attachment details; None for unsupported messages."""
+	for attr, extract in _HANDLERS:
+		obj = getattr(message, attr)
+		if obj:
+			return extract(obj, message)
+	return None
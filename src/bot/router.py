@@ -1,35 +1,187 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
 import json
 import logging
+import os
+import tempfile
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
 from datetime import datetime
 from pathlib import Path
+from typing import NamedTuple
 
 from aiogram import Bot, Router
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Document, Message
 
+from src.bot.message_types import extract_message_info
 from src.core.config import AppConfig
 from src.core.storage import Storage
+from src.core.write_buffer import AsyncWriteBuffer
 from src.domain.models import TranscriptionResult
 from src.transcription.audio_io import safe_stem
 from src.transcription.router import TranscriptionRouter
+from src.utils.filenames import file_ext
+from src.utils.text import split_text
 
 logger = logging.getLogger(__name__)
 
+_VIDEO_EXTS = frozenset({"mp4", "avi", "mov", "mkv", "webm", "flv", "wmv", "m4v", "3gp"})
+_MIME_AUDIO_PREFIX = "audio/"
+_MIME_VIDEO_PREFIX = "video/"
+_TELEGRAM_MAX_LEN = 4096
+# Transcripts are sent in chunks of this size, leaving headroom below the limit
+_MAX_CHUNK_LEN = 3500
 
-def get_router(*, config: AppConfig, storage: Storage) -> Router:
+# User-facing texts
+_MSG_START = (
+	"👋 Привет! Отправьте голос, аудио или видео — верну текст.\n"
+	"/help — помощь, /settings — настройки"
+)
+_MSG_HELP = (
+	"Отправьте voice, аудио (ogg/mp3/m4a/wav/webm/flac), "
+	"видео (mp4/avi/mov/mkv/webm) или video note.\n"
+	"Я извлеку аудиодорожку, определю язык и верну транскрипт.\n"
+	"По умолчанию использую локальную модель, при ошибках — резерв OpenAI."
+)
+_MSG_SETTINGS = "Настройки будут добавлены на следующем этапе (выбор провайдера/языка/режима)."
+# Static command replies: command -> (event type, reply text)
+_COMMAND_REPLIES = {
+	"start": ("command_start", _MSG_START),
+	"help": ("command_help", _MSG_HELP),
+	"settings": ("command_settings", _MSG_SETTINGS),
+}
+_MSG_EXPECT_MEDIA = "Ожидается звуковой файл, видео или сообщение голосом"
+_MSG_PROC_AUDIO = "Обрабатываю аудио…"
+_MSG_PROC_VIDEO = "Обрабатываю видео…"
+_MSG_EMPTY = "(пусто)"
+_MSG_PREFIX_AUDIO = "Расшифровка звуковго файла: \n"
+_MSG_PREFIX_VIDEO = "Расшифровка видео: \n"
+_CHUNK_SIZE_AUDIO = _MAX_CHUNK_LEN - len(_MSG_PREFIX_AUDIO)
+_CHUNK_SIZE_VIDEO = _MAX_CHUNK_LEN - len(_MSG_PREFIX_VIDEO)
+# Larger read/write blocks mean fewer aiofiles thread hand-offs per downloaded file
+_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+_SAVED_FILES_CACHE_SIZE = 4096
+# Event details JSON: one reusable C-accelerated encoder, compact and without \u escapes
+_dump_details = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _write_json(path: Path, data: dict) -> None:
+	"""Atomically write data to path as UTF-8 JSON.
+
+	json.dumps without indent takes the C encoder fast path; json.dump and
+	indented output fall back to the pure-Python encoder. The payload goes to
+	a temp file first, so a crash never leaves a truncated JSON behind; the temp
+	name is unique, so concurrent writes to the same path never share it.
+	"""
+	payload = json.dumps(data, ensure_ascii=False)
+	tmp = tempfile.NamedTemporaryFile(
+		"w", encoding="utf-8", dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+	)
+	try:
+		with tmp:
+			tmp.write(payload)
+		os.replace(tmp.name, path)
+	except BaseException:
+		Path(tmp.name).unlink(missing_ok=True)
+		raise
+
+
+def _transcription_workers(config: AppConfig) -> int:
+	"""Worker threads for transcription: the configured value, else one per local model.
+
+	A local whisper model is a single in-process (often GPU) instance, so jobs queue on
+	one thread; cloud requests are network-bound and can run a few at a time.
+	"""
+	if config.transcription.concurrency is not None:
+		return config.transcription.concurrency
+	if config.provider.default == "local":
+		return 1
+	return min(4, os.cpu_count() or 1)
+
+
+class _MsgCtx(NamedTuple):
+	"""Ids of an incoming message, derived once per handler call."""
+
+	user_id: str
+	chat_id: str
+	message_id: int
+
+
+def _ctx(message: Message) -> _MsgCtx:
+	return _MsgCtx(
+		user_id=str(message.from_user.id) if message.from_user else "unknown",
+		chat_id=str(message.chat.id) if message.chat else "unknown",
+		message_id=message.message_id,
+	)
+
+
+@contextlib.contextmanager
+def _log_errors(what: str, *args: object) -> Iterator[None]:
+	"""Log and swallow any exception from the block; what/args describe the operation.
+
+	These are side saves (files, logs), so a one-line warning is enough: no traceback.
+	"""
+	try:
+		yield
+	except Exception as exc:
+		logger.warning("Error " + what + ": %s", *args, exc)
+
+
+def get_router(
+	*, config: AppConfig, storage: Storage, write_buffer: AsyncWriteBuffer
+) -> Router:
 	"""Build and return the main bot router."""
 	router = Router(name="root")
 	tr_router = TranscriptionRouter(config=config)
+	# Transcription is blocking CPU/GPU work; keep it off the event loop
+	tr_executor = concurrent.futures.ThreadPoolExecutor(
+		max_workers=_transcription_workers(config), thread_name_prefix="transcribe"
+	)
+	audio_exts = frozenset(config.audio.formats)
+	# Runtime dirs are resolved by storage; create them once for the router lifetime
+	inbox_dir = storage.inbox_dir
+	inbox_dir.mkdir(parents=True, exist_ok=True)
+	out_dir = storage.out_dir
+	out_dir.mkdir(parents=True, exist_ok=True)
+	# file_unique_id -> inbox path (LRU) so resent files skip the stat and download
+	saved_files: OrderedDict[str, Path] = OrderedDict()
+
+	def _inbox_path(filename: str, stem: str) -> Path:
+		"""Inbox destination for filename, keeping the original extension if any."""
+		ext = file_ext(filename)
+		return inbox_dir / (f"{stem}.{ext}" if ext else stem)
 
 	async def _download_by_file_id(bot: Bot, file_id: str, dest: Path) -> None:
+		"""Stream Telegram file to dest chunk by chunk, never holding it whole in memory."""
 		file = await bot.get_file(file_id)
-		dest.parent.mkdir(parents=True, exist_ok=True)
-		await bot.download_file(file.file_path, destination=dest)
+		# Path destination makes aiogram write each chunk as it arrives
+		await bot.download_file(
+			file.file_path,
+			destination=dest,
+			timeout=config.timeouts.download_sec,
+			chunk_size=_DOWNLOAD_CHUNK_SIZE,
+		)
+
+	def _remember_saved_file(file_unique_id: str | None, path: Path) -> None:
+		if file_unique_id is None:
+			return
+		saved_files[file_unique_id] = path
+		saved_files.move_to_end(file_unique_id)
+		if len(saved_files) > _SAVED_FILES_CACHE_SIZE:
+			saved_files.popitem(last=False)
 
 	async def _save_file_to_inbox(
-		bot: Bot, file_id: str, filename: str, message_type: str = "file"
+		bot: Bot,
+		file_id: str,
+		filename: str,
+		message_type: str = "file",
+		*,
+		file_unique_id: str | None = None,
 	) -> Path | None:
 		"""Save any file to inbox directory.
 		
@@ -38,53 +190,161 @@ def get_router(*, config: AppConfig, storage: Storage) -> Router:
 			file_id: Telegram file_id
 			filename: Target filename
 			message_type: Type of message (for logging)
+			file_unique_id: Telegram file_unique_id; repeats are answered from memory
 			
 		Returns:
 			Path to saved file or None if error occurred
 		"""
-		try:
-			inbox_dir = Path(config.paths.inbox_dir)
-			stem = safe_stem(filename)
-			dest_path = inbox_dir / f"{stem}"
-			# Keep original extension if possible
-			if "." in filename:
-				dest_path = dest_path.with_suffix("." + filename.rsplit(".", 1)[-1])
+		if file_unique_id is not None and file_unique_id in saved_files:
+			saved_files.move_to_end(file_unique_id)
+			return saved_files[file_unique_id]
+		with _log_errors("saving %s file to inbox", message_type):
+			dest_path = _inbox_path(filename, safe_stem(filename))
 			
-			# Skip if file already exists
-			if dest_path.exists():
-				logger.debug(f"File already exists in inbox: {dest_path}")
+			# Reserve the name atomically; skip if the file already exists
+			try:
+				fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+			except FileExistsError:
+				# May be the placeholder of a download still in progress: not cached
+				logger.debug("File already exists in inbox: %s", dest_path)
 				return dest_path
+			os.close(fd)
 			
-			logger.debug(f"Saving {message_type} file {file_id} to {dest_path}")
-			await _download_by_file_id(bot, file_id, dest_path)
-			logger.info(f"Saved {message_type} file to inbox: {dest_path.name}")
+			logger.debug("Saving %s file %s to %s", message_type, file_id, dest_path)
+			try:
+				await _download_by_file_id(bot, file_id, dest_path)
+			except BaseException:
+				# Drop the empty placeholder so a retry is not taken for a saved file
+				dest_path.unlink(missing_ok=True)
+				if file_unique_id is not None:
+					saved_files.pop(file_unique_id, None)
+				raise
+			logger.info("Saved %s file to inbox: %s", message_type, dest_path.name)
+			_remember_saved_file(file_unique_id, dest_path)
 			return dest_path
-		except Exception as exc:
-			logger.error(f"Error saving {message_type} file to inbox: {exc}", exc_info=True)
-			return None
+		return None
 
-	async def _save_response(
-		message: Message, response_text: str, response_type: str = "text"
-	) -> None:
-		"""Save bot response to database."""
+	async def _transcribe(
+		src_path: Path, ctx: _MsgCtx, *, on_part: Callable[[str], None] | None = None
+	) -> TranscriptionResult:
+		"""Run blocking transcription in the dedicated executor."""
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(
+			tr_executor,
+			functools.partial(
+				tr_router.transcribe,
+				src_path,
+				message_id=ctx.message_id,
+				user_id=ctx.user_id,
+				on_part=on_part,
+			),
+		)
+
+	async def _transcribe_streaming(
+		message: Message, ctx: _MsgCtx, src_path: Path, *, prefix: str, chunk_size: int
+	) -> tuple[TranscriptionResult, str | None]:
+		"""Transcribe, sending full-size chunks while later audio is still being processed.
+
+		Returns the result and the transcript tail not sent yet, or None if nothing was
+		sent (short or cached transcripts): then the caller sends the whole text. A failed
+		send is not a transcription error: streaming stops and None is returned, so the
+		caller still saves the transcript and sends it whole.
+		"""
+		loop = asyncio.get_running_loop()
+		parts: asyncio.Queue[str | None] = asyncio.Queue()
+
+		def on_part(text: str) -> None:
+			# Called from the transcription thread
+			loop.call_soon_threadsafe(parts.put_nowait, text)
+
+		async def stream() -> str | None:
+			buffer = ""
+			first = True
+			failed = False
+			while (part := await parts.get()) is not None:
+				if failed:
+					continue
+				buffer = f"{buffer} {part}" if buffer else part
+				if len(buffer) <= chunk_size:
+					continue
+				# Keep the last piece back: text of the next audio chunk may still join it
+				*ready, buffer = split_text(buffer, chunk_size)
+				if first:
+					ready[0] = f"{prefix}'{ready[0]}'"
+					first = False
+				try:
+					await _answer_all(message, ctx, ready)
+				except Exception as exc:
+					logger.warning("Error streaming transcript: %s", exc)
+					failed = True
+			return None if first or failed else buffer
+
+		streamer = asyncio.create_task(stream())
 		try:
-			user_id = str(message.from_user.id) if message.from_user else "unknown"
-			chat_id = str(message.chat.id) if message.chat else "unknown"
-			message_id = message.message_id
-			storage.save_bot_response(
-				message_id=message_id,
-				user_id=user_id,
-				chat_id=chat_id,
-				response_type=response_type,
-				content=response_text,
+			res = await _transcribe(src_path, ctx, on_part=on_part)
+		except BaseException:
+			streamer.cancel()
+			raise
+		# Parts are queued before the executor future resolves, so the sentinel comes last
+		parts.put_nowait(None)
+		return res, await streamer
+
+	def _save_event(ctx: _MsgCtx, event_type: str, details: str | None = None) -> None:
+		"""Queue event for the batched database writer."""
+		write_buffer.enqueue(
+			"events",
+			{
+				"message_id": ctx.message_id,
+				"user_id": ctx.user_id,
+				"event_type": event_type,
+				"details": details,
+			},
+		)
+
+	def _response_row(ctx: _MsgCtx, response_text: str, response_type: str) -> dict:
+		return {
+			"message_id": ctx.message_id,
+			"user_id": ctx.user_id,
+			"chat_id": ctx.chat_id,
+			"response_type": response_type,
+			"content": response_text,
+		}
+
+	def _save_response(ctx: _MsgCtx, response_text: str, response_type: str = "text") -> None:
+		"""Queue bot response for the batched database writer."""
+		write_buffer.enqueue("bot_responses", _response_row(ctx, response_text, response_type))
+
+	async def _answer_all(message: Message, ctx: _MsgCtx, pieces: list[str]) -> None:
+		"""Send pieces in order, then queue all sent ones for saving in one batch.
+
+		Sends stay sequential: Telegram does not preserve the order of concurrent requests.
+		"""
+		sent: list[str] = []
+		try:
+			for piece in pieces:
+				await message.answer(piece)
+				sent.append(piece)
+		finally:
+			write_buffer.enqueue_many(
+				"bot_responses", [_response_row(ctx, piece, "text") for piece in sent]
 			)
-		except Exception as exc:
-			logger.error(f"Error saving bot response: {exc}", exc_info=True)
+
+	async def _send_chunked(
+		message: Message, ctx: _MsgCtx, text: str, *, prefix: str | None, chunk_size: int
+	) -> None:
+		"""Send text in Telegram-sized chunks split between words and queue them for saving."""
+		# prefix and quotes are added to the first chunk, keep room for them when merging
+		max_len = _TELEGRAM_MAX_LEN - (len(prefix) + 2 if prefix is not None else 0)
+		chunks = split_text(text, chunk_size, max_len=max_len)
+		if prefix is not None:
+			chunks[0] = f"{prefix}'{chunks[0]}'"
+		await _answer_all(message, ctx, chunks)
 
 	async def _save_transcription_to_json(
 		result: TranscriptionResult,
 		*,
 		filename: str,
+		stem: str,
 		file_id: str,
 		message_id: int,
 		user_id: str,
@@ -95,6 +355,7 @@ def get_router(*, config: AppConfig, storage: Storage) -> Router:
 		Args:
 			result: TranscriptionResult with text, language, segments, provider
 			filename: Original filename
+			stem: Filesystem-safe stem of filename
 			file_id: Telegram file_id
 			message_id: Telegram message_id
 			user_id: User ID
@@ -103,9 +364,7 @@ def get_router(*, config: AppConfig, storage: Storage) -> Router:
 		Returns:
 			Path to saved JSON file or None if error occurred
 		"""
-		try:
-			out_dir = Path(config.paths.out_dir)
-			stem = safe_stem(filename)
+		with _log_errors("saving transcription JSON"):
 			json_path = out_dir / f"{stem}_transcript.json"
 			
 			# Prepare JSON data
@@ -125,378 +384,248 @@ def get_router(*, config: AppConfig, storage: Storage) -> Router:
 					"text_length": len(result.text) if result.text else 0,
 					"segments_count": len(result.segments),
 				},
-				"segments": [
-					{
-						"start": seg.start,
-						"end": seg.end,
-						"text": seg.text,
-					}
-					for seg in result.segments
-				],
+				# Columnar layout: segment i is (start[i], end[i], text[i])
+				"segments": {
+					"start": [seg.start for seg in result.segments],
+					"end": [seg.end for seg in result.segments],
+					"text": [seg.text for seg in result.segments],
+				},
 			}
 			
 			# Write JSON file
-			out_dir.mkdir(parents=True, exist_ok=True)
-			with json_path.open("w", encoding="utf-8") as f:
-				json.dump(json_data, f, ensure_ascii=False, indent=2)
+			await asyncio.to_thread(_write_json, json_path, json_data)
 			
-			logger.info(f"Saved transcription JSON to {json_path.name}")
+			logger.info("Saved transcription JSON to %s", json_path.name)
 			return json_path
-		except Exception as exc:
-			logger.error(f"Error saving transcription JSON: {exc}", exc_info=True)
-			return None
+		return None
 
 	async def _handle_audio(message: Message, bot: Bot, *, file_id: str, filename: str) -> None:
-		user_id = str(message.from_user.id) if message.from_user else "unknown"
-		message_id = message.message_id
+		ctx = _ctx(message)
+		stem = safe_stem(filename)
 		
-		logger.info(f"Received audio from user {user_id}: {filename}")
+		logger.info("Received audio from user %s: %s", ctx.user_id, filename)
 		
 		# Save transcription start event
-		try:
-			storage.save_event(
-				message_id=message_id,
-				user_id=user_id,
-				event_type="transcription_start",
-				details=json.dumps({"filename": filename, "file_id": file_id}),
-			)
-		except Exception as exc:
-			logger.error(f"Error saving transcription_start event: {exc}", exc_info=True)
+		_save_event(
+			ctx,
+			"transcription_start",
+			_dump_details({"filename": filename, "file_id": file_id}),
+		)
 		
-		inbox_dir = Path(config.paths.inbox_dir)
-		stem = safe_stem(filename)
-		src_path = inbox_dir / f"{stem}"
-		# keep original extension if possible
-		if "." in filename:
-			src_path = src_path.with_suffix("." + filename.rsplit(".", 1)[-1])
+		src_path = _inbox_path(filename, stem)
 		
-		logger.debug(f"Downloading file {file_id} to {src_path}")
+		logger.debug("Downloading file %s to %s", file_id, src_path)
 		await _download_by_file_id(bot, file_id, src_path)
 
-		processing_msg = "Обрабатываю аудио…"
-		await message.answer(processing_msg)
-		await _save_response(message, processing_msg, response_type="processing")
+		await message.answer(_MSG_PROC_AUDIO)
+		_save_response(ctx, _MSG_PROC_AUDIO, "processing")
 		
 		try:
-			res = tr_router.transcribe(src_path, message_id=message_id, user_id=user_id)
-			text = res.text or "(пусто)"
+			res, unsent = await _transcribe_streaming(
+				message, ctx, src_path, prefix=_MSG_PREFIX_AUDIO, chunk_size=_CHUNK_SIZE_AUDIO
+			)
+			text = res.text or _MSG_EMPTY
 			logger.info(
-				f"Transcription successful for user {user_id}. "
-				f"Provider: {res.provider}, Language: {res.language}, Length: {len(text)} chars"
+				"Transcription successful for user %s. "
+				"Provider: %s, Language: %s, Length: %d chars",
+				ctx.user_id,
+				res.provider,
+				res.language,
+				len(text),
 			)
 			
-			# Save transcription to JSON file
-			try:
-				await _save_transcription_to_json(
+			# Save transcription success event
+			_save_event(
+				ctx,
+				"transcription_success",
+				_dump_details({
+					"provider": res.provider,
+					"language": res.language,
+					"text_length": len(text),
+				}),
+			)
+			
+			# Write the JSON file while the transcript is being sent
+			await asyncio.gather(
+				_save_transcription_to_json(
 					res,
 					filename=filename,
+					stem=stem,
 					file_id=file_id,
-					message_id=message_id,
-					user_id=user_id,
+					message_id=ctx.message_id,
+					user_id=ctx.user_id,
 					message_type="audio",
-				)
-			except Exception as exc:
-				logger.error(f"Error saving transcription JSON: {exc}", exc_info=True)
-			
-			# Save transcription success event
-			try:
-				storage.save_event(
-					message_id=message_id,
-					user_id=user_id,
-					event_type="transcription_success",
-					details=json.dumps({
-						"provider": res.provider,
-						"language": res.language,
-						"text_length": len(text),
-					}),
-				)
-			except Exception as exc:
-				logger.error(f"Error saving transcription_success event: {exc}", exc_info=True)
-			
-			# Telegram message limit ~4096 chars; send by chunks
-			prefix = "Расшифровка звуковго файла: \n"
-			chunk_size = 3500 - len(prefix)
-			for i in range(0, len(text), chunk_size):
-				chunk = text[i : i + chunk_size]
-				if i == 0:
-					response_text = f"{prefix}'{chunk}'"
-				else:
-					response_text = chunk
-				await message.answer(response_text)
-				await _save_response(message, response_text, response_type="text")
+				),
+				# Only the tail is left if part of the transcript was streamed already
+				_send_chunked(
+					message,
+					ctx,
+					text if unsent is None else unsent,
+					prefix=_MSG_PREFIX_AUDIO if unsent is None else None,
+					chunk_size=_CHUNK_SIZE_AUDIO,
+				),
+			)
 		except Exception as exc:
-			logger.error(f"Transcription failed for user {user_id}: {exc}", exc_info=True)
+			logger.error("Transcription failed for user %s: %s", ctx.user_id, exc, exc_info=True)
 			
 			# Save transcription error event
-			try:
-				storage.save_event(
-					message_id=message_id,
-					user_id=user_id,
-					event_type="transcription_error",
-					details=json.dumps({"error": str(exc)}),
-				)
-			except Exception as save_exc:
-				logger.error(f"Error saving transcription_error event: {save_exc}", exc_info=True)
+			_save_event(
+				ctx,
+				"transcription_error",
+				_dump_details({"error": str(exc)}),
+			)
 			
 			error_msg = f"Ошибка обработки: {exc}"
 			await message.answer(error_msg)
-			await _save_response(message, error_msg, response_type="error")
+			_save_response(ctx, error_msg, "error")
 
 	async def _handle_video(message: Message, bot: Bot, *, file_id: str, filename: str) -> None:
 		"""Handle video file transcription by extracting audio track."""
-		user_id = str(message.from_user.id) if message.from_user else "unknown"
-		message_id = message.message_id
+		ctx = _ctx(message)
+		stem = safe_stem(filename)
 		
-		logger.info(f"Received video from user {user_id}: {filename}")
+		logger.info("Received video from user %s: %s", ctx.user_id, filename)
 		
 		# Save transcription start event
-		try:
-			storage.save_event(
-				message_id=message_id,
-				user_id=user_id,
-				event_type="transcription_start",
-				details=json.dumps({"filename": filename, "file_id": file_id, "type": "video"}),
-			)
-		except Exception as exc:
-			logger.error(f"Error saving transcription_start event: {exc}", exc_info=True)
+		_save_event(
+			ctx,
+			"transcription_start",
+			_dump_details({"filename": filename, "file_id": file_id, "type": "video"}),
+		)
 		
-		inbox_dir = Path(config.paths.inbox_dir)
-		stem = safe_stem(filename)
-		src_path = inbox_dir / f"{stem}"
-		# keep original extension if possible
-		if "." in filename:
-			src_path = src_path.with_suffix("." + filename.rsplit(".", 1)[-1])
+		src_path = _inbox_path(filename, stem)
 		
-		logger.debug(f"Downloading video file {file_id} to {src_path}")
+		logger.debug("Downloading video file %s to %s", file_id, src_path)
 		await _download_by_file_id(bot, file_id, src_path)
 
-		processing_msg = "Обрабатываю видео…"
-		await message.answer(processing_msg)
-		await _save_response(message, processing_msg, response_type="processing")
+		await message.answer(_MSG_PROC_VIDEO)
+		_save_response(ctx, _MSG_PROC_VIDEO, "processing")
 		
 		try:
-			res = tr_router.transcribe(src_path, message_id=message_id, user_id=user_id)
-			text = res.text or "(пусто)"
+			res, unsent = await _transcribe_streaming(
+				message, ctx, src_path, prefix=_MSG_PREFIX_VIDEO, chunk_size=_CHUNK_SIZE_VIDEO
+			)
+			text = res.text or _MSG_EMPTY
 			logger.info(
-				f"Video transcription successful for user {user_id}. "
-				f"Provider: {res.provider}, Language: {res.language}, Length: {len(text)} chars"
+				"Video transcription successful for user %s. "
+				"Provider: %s, Language: %s, Length: %d chars",
+				ctx.user_id,
+				res.provider,
+				res.language,
+				len(text),
 			)
 			
-			# Save transcription to JSON file
-			try:
-				await _save_transcription_to_json(
+			# Save transcription success event
+			_save_event(
+				ctx,
+				"transcription_success",
+				_dump_details({
+					"provider": res.provider,
+					"language": res.language,
+					"text_length": len(text),
+					"type": "video",
+				}),
+			)
+			
+			# Write the JSON file while the transcript is being sent
+			await asyncio.gather(
+				_save_transcription_to_json(
 					res,
 					filename=filename,
+					stem=stem,
 					file_id=file_id,
-					message_id=message_id,
-					user_id=user_id,
+					message_id=ctx.message_id,
+					user_id=ctx.user_id,
 					message_type="video",
-				)
-			except Exception as exc:
-				logger.error(f"Error saving transcription JSON: {exc}", exc_info=True)
-			
-			# Save transcription success event
-			try:
-				storage.save_event(
-					message_id=message_id,
-					user_id=user_id,
-					event_type="transcription_success",
-					details=json.dumps({
-						"provider": res.provider,
-						"language": res.language,
-						"text_length": len(text),
-						"type": "video",
-					}),
-				)
-			except Exception as exc:
-				logger.error(f"Error saving transcription_success event: {exc}", exc_info=True)
-			
-			# Telegram message limit ~4096 chars; send by chunks
-			prefix = "Расшифровка видео: \n"
-			chunk_size = 3500 - len(prefix)
-			for i in range(0, len(text), chunk_size):
-				chunk = text[i : i + chunk_size]
-				if i == 0:
-					response_text = f"{prefix}'{chunk}'"
-				else:
-					response_text = chunk
-				await message.answer(response_text)
-				await _save_response(message, response_text, response_type="text")
+				),
+				# Only the tail is left if part of the transcript was streamed already
+				_send_chunked(
+					message,
+					ctx,
+					text if unsent is None else unsent,
+					prefix=_MSG_PREFIX_VIDEO if unsent is None else None,
+					chunk_size=_CHUNK_SIZE_VIDEO,
+				),
+			)
 		except Exception as exc:
-			logger.error(f"Video transcription failed for user {user_id}: {exc}", exc_info=True)
+			logger.error(
+				"Video transcription failed for user %s: %s", ctx.user_id, exc, exc_info=True
+			)
 			
 			# Save transcription error event
-			try:
-				storage.save_event(
-					message_id=message_id,
-					user_id=user_id,
-					event_type="transcription_error",
-					details=json.dumps({"error": str(exc), "type": "video"}),
-				)
-			except Exception as save_exc:
-				logger.error(f"Error saving transcription_error event: {save_exc}", exc_info=True)
+			_save_event(
+				ctx,
+				"transcription_error",
+				_dump_details({"error": str(exc), "type": "video"}),
+			)
 			
 			error_msg = f"Ошибка обработки видео: {exc}"
 			await message.answer(error_msg)
-			await _save_response(message, error_msg, response_type="error")
+			_save_response(ctx, error_msg, "error")
 
-	@router.message(Command("start"))
-	async def cmd_start(message: Message) -> None:
-		user_id = str(message.from_user.id) if message.from_user else "unknown"
-		message_id = message.message_id
-		logger.info(f"User {user_id} started bot")
+	@router.message(Command(*_COMMAND_REPLIES))
+	async def cmd_reply(message: Message, command: CommandObject) -> None:
+		ctx = _ctx(message)
+		event_type, reply = _COMMAND_REPLIES[command.command]
+		if command.command == "start":
+			logger.info("User %s started bot", ctx.user_id)
 		
 		# Save command event
-		try:
-			storage.save_event(
-				message_id=message_id,
-				user_id=user_id,
-				event_type="command_start",
-			)
-		except Exception as exc:
-			logger.error(f"Error saving command_start event: {exc}", exc_info=True)
+		_save_event(ctx, event_type)
 		
-		response_text = (
-			"👋 Привет! Отправьте голос, аудио или видео — верну текст.\n"
-			"/help — помощь, /settings — настройки"
-		)
-		await message.answer(response_text)
-		await _save_response(message, response_text)
-
-	@router.message(Command("help"))
-	async def cmd_help(message: Message) -> None:
-		user_id = str(message.from_user.id) if message.from_user else "unknown"
-		message_id = message.message_id
-		
-		# Save command event
-		try:
-			storage.save_event(
-				message_id=message_id,
-				user_id=user_id,
-				event_type="command_help",
-			)
-		except Exception as exc:
-			logger.error(f"Error saving command_help event: {exc}", exc_info=True)
-		
-		response_text = (
-			"Отправьте voice, аудио (ogg/mp3/m4a/wav/webm/flac), "
-			"видео (mp4/avi/mov/mkv/webm) или video note.\n"
-			"Я извлеку аудиодорожку, определю язык и верну транскрипт.\n"
-			"По умолчанию использую локальную модель, при ошибках — резерв OpenAI."
-		)
-		await message.answer(response_text)
-		await _save_response(message, response_text)
-
-	@router.message(Command("settings"))
-	async def cmd_settings(message: Message) -> None:
-		user_id = str(message.from_user.id) if message.from_user else "unknown"
-		message_id = message.message_id
-		
-		# Save command event
-		try:
-			storage.save_event(
-				message_id=message_id,
-				user_id=user_id,
-				event_type="command_settings",
-			)
-		except Exception as exc:
-			logger.error(f"Error saving command_settings event: {exc}", exc_info=True)
-		
-		response_text = (
-			"Настройки будут добавлены на следующем этапе (выбор провайдера/языка/режима)."
-		)
-		await message.answer(response_text)
-		await _save_response(message, response_text)
+		await message.answer(reply)
+		_save_response(ctx, reply)
 
 	@router.message()
 	async def on_message(message: Message, bot: Bot) -> None:
-		# voice
-		if message.voice:
-			file_id = message.voice.file_id
-			filename = f"voice_{message.voice.file_unique_id}.ogg"
-			return await _handle_audio(message, bot, file_id=file_id, filename=filename)
-		# audio
-		if message.audio:
-			file_id = message.audio.file_id
-			filename = message.audio.file_name or f"audio_{message.audio.file_unique_id}.mp3"
-			return await _handle_audio(message, bot, file_id=file_id, filename=filename)
+		info = extract_message_info(message)
+		kind = info.message_type if info else None
+		# voice, audio and video note (circle)
+		if kind in ("voice", "audio", "video_note"):
+			await _handle_audio(message, bot, file_id=info.file_id, filename=info.filename)
 		# video
-		if message.video:
-			file_id = message.video.file_id
-			filename = message.video.file_name or f"video_{message.video.file_unique_id}.mp4"
-			return await _handle_video(message, bot, file_id=file_id, filename=filename)
-		# video note (circle)
-		if message.video_note:
-			file_id = message.video_note.file_id
-			filename = f"videonote_{message.video_note.file_unique_id}.mp4"
-			return await _handle_audio(message, bot, file_id=file_id, filename=filename)
+		elif kind == "video":
+			await _handle_video(message, bot, file_id=info.file_id, filename=info.filename)
 		# documents that may contain audio or video
-		if message.document:
-			is_audio = _is_audio_document(message.document)
-			is_video = _is_video_document(message.document)
-			if is_audio or is_video:
-				file_id = message.document.file_id
-				filename = message.document.file_name or f"doc_{message.document.file_unique_id}"
-				if is_video:
-					return await _handle_video(message, bot, file_id=file_id, filename=filename)
-				return await _handle_audio(message, bot, file_id=file_id, filename=filename)
-			# Save non-audio/video documents to inbox
-			file_id = message.document.file_id
-			filename = message.document.file_name or f"doc_{message.document.file_unique_id}"
-			await _save_file_to_inbox(bot, file_id, filename, message_type="document")
-		
-		# photo (save largest size)
-		if message.photo:
-			# Get largest photo size
-			largest_photo = max(message.photo, key=lambda p: p.width * p.height)
-			file_id = largest_photo.file_id
-			# Determine extension from mime_type or use jpg as default
-			ext = "jpg"
-			if largest_photo.file_path:
-				ext = largest_photo.file_path.rsplit(".", 1)[-1] if "." in largest_photo.file_path else "jpg"
-			filename = f"photo_{largest_photo.file_unique_id}.{ext}"
-			await _save_file_to_inbox(bot, file_id, filename, message_type="photo")
-		
-		# sticker
-		if message.sticker:
-			file_id = message.sticker.file_id
-			# Determine extension from mime_type or use webp as default
-			ext = "webp"
-			if message.sticker.mime_type:
-				ext = message.sticker.mime_type.split("/")[-1] if "/" in message.sticker.mime_type else "webp"
-			filename = f"sticker_{message.sticker.file_unique_id}.{ext}"
-			await _save_file_to_inbox(bot, file_id, filename, message_type="sticker")
-		
-		# animation (GIF)
-		if message.animation:
-			file_id = message.animation.file_id
-			filename = message.animation.file_name or f"animation_{message.animation.file_unique_id}.gif"
-			await _save_file_to_inbox(bot, file_id, filename, message_type="animation")
-		
+		elif kind == "document":
+			doc_kind = _classify_document(message.document)
+			if doc_kind == "video":
+				await _handle_video(message, bot, file_id=info.file_id, filename=info.filename)
+			elif doc_kind == "audio":
+				await _handle_audio(message, bot, file_id=info.file_id, filename=info.filename)
+			else:
+				# Save non-audio/video documents to inbox
+				await _save_file_to_inbox(
+					bot,
+					info.file_id,
+					info.filename,
+					message_type="document",
+					file_unique_id=info.file_unique_id,
+				)
+		# photo (largest size), sticker, animation (GIF)
+		elif kind in ("photo", "sticker", "animation"):
+			await _save_file_to_inbox(
+				bot,
+				info.file_id,
+				info.filename,
+				message_type=kind,
+				file_unique_id=info.file_unique_id,
+			)
 		# Handle non-audio/video messages
-		if not any([message.voice, message.audio, message.video, message.video_note, 
-		            message.document, message.photo, message.sticker, message.animation]):
-			response_text = "Ожидается звуковой файл, видео или сообщение голосом"
-			await message.answer(response_text)
-			await _save_response(message, response_text, response_type="info")
-
-	def _is_audio_document(doc: Document) -> bool:
-		if doc.mime_type and doc.mime_type.startswith("audio/"):
-			return True
-		if doc.file_name:
-			ext = doc.file_name.lower().rsplit(".", 1)[-1] if "." in doc.file_name else ""
-			return ext in set(config.audio.formats)
-		return False
-
-	def _is_video_document(doc: Document) -> bool:
-		"""Check if document is a video file."""
-		if doc.mime_type and doc.mime_type.startswith("video/"):
-			return True
-		if doc.file_name:
-			ext = doc.file_name.lower().rsplit(".", 1)[-1] if "." in doc.file_name else ""
-			video_extensions = {"mp4", "avi", "mov", "mkv", "webm", "flv", "wmv", "m4v", "3gp"}
-			return ext in video_extensions
-		return False
+		else:
+			await message.answer(_MSG_EXPECT_MEDIA)
+			_save_response(_ctx(message), _MSG_EXPECT_MEDIA, "info")
+
+	def _classify_document(doc: Document) -> str | None:
+		"""Return "video", "audio" or None for a document; video wins when both match."""
+		mime_type = doc.mime_type or ""
+		# Only the suffix is lower-cased, not the whole file name
+		ext = file_ext(doc.file_name or "")
+		if mime_type.startswith(_MIME_VIDEO_PREFIX) or ext in _VIDEO_EXTS:
+			return "video"
+		if mime_type.startswith(_MIME_AUDIO_PREFIX) or ext in audio_exts:
+			return "audio"
+		return None
 
 	return router
 
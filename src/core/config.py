@@ -34,6 +34,16 @@ class AudioConfig(BaseModel):
 	)
 
 
+class TranscriptionConfig(BaseModel):
+	# Parallel transcription jobs; None picks 1 for the local model, a few for cloud
+	concurrency: int | None = Field(default=None, ge=1)
+
+
+class TelegramConfig(BaseModel):
+	# Pool size of the shared Bot API HTTP session (API calls and file downloads)
+	connection_limit: int = Field(default=50, ge=1)
+
+
 class ChunkConfig(BaseModel):
 	max_sec: int = 90
 
@@ -41,6 +51,7 @@ class ChunkConfig(BaseModel):
 class Timeouts(BaseModel):
 	local_sec: int = 180
 	cloud_sec: int = 180
+	download_sec: int = 300
 
 
 class Paths(BaseModel):
@@ -50,6 +61,8 @@ class Paths(BaseModel):
 	cache_dir: str = "var/cache"
 	out_dir: str = "var/out"
 	db_path: str = "var/app.db"
+	# Messages, bot responses and events; defaults to events.db next to db_path
+	log_db_path: str | None = None
 	model_dir: str = "var/models"
 
 
@@ -62,6 +75,8 @@ class AppConfig(BaseModel):
 	local: LocalConfig = LocalConfig()
 	cloud: CloudConfig = CloudConfig()
 	audio: AudioConfig = AudioConfig()
+	transcription: TranscriptionConfig = TranscriptionConfig()
+	telegram: TelegramConfig = TelegramConfig()
 	chunk: ChunkConfig = ChunkConfig()
 	timeouts: Timeouts = Timeouts()
 	paths: Paths = Paths()
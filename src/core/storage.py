@@ -1,136 +1,285 @@
 from __future__ import annotations
 
 import sqlite3
-from dataclasses import dataclass
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from src.core.config import AppConfig
 
+# Applied to every new connection; WAL + NORMAL keeps commits off the fsync path
+_PRAGMAS = (
+	"PRAGMA journal_mode=WAL",
+	"PRAGMA synchronous=NORMAL",
+	"PRAGMA temp_store=MEMORY",
+	"PRAGMA mmap_size=268435456",
+	"PRAGMA cache_size=-20000",
+)
 
-@dataclass
+# Columns added to transcripts after the first release; older databases get them via ALTER
+_TRANSCRIPTS_ADDED_COLUMNS = (("message_id", "INTEGER"), ("user_id", "TEXT"))
+
+_SCHEMA_MAIN = """
+	CREATE TABLE IF NOT EXISTS transcripts (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		file_hash TEXT UNIQUE NOT NULL,
+		language TEXT,
+		text TEXT NOT NULL,
+		provider TEXT NOT NULL,
+		message_id INTEGER,
+		user_id TEXT,
+		created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+	);
+	CREATE TABLE IF NOT EXISTS user_settings (
+		user_id TEXT PRIMARY KEY,
+		provider TEXT,
+		language TEXT,
+		mode TEXT
+	);
+	CREATE INDEX IF NOT EXISTS idx_transcripts_user_id ON transcripts(user_id);
+"""
+
+# Append-only logs live in their own database file (see Storage._connect_log).
+# Per-user history queries filter by user_id (and event_type) and sort by created_at DESC;
+# composite indexes serve both without a separate sort
+_SCHEMA_LOG = """
+	CREATE TABLE IF NOT EXISTS messages (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		message_id INTEGER NOT NULL,
+		user_id TEXT NOT NULL,
+		chat_id TEXT NOT NULL,
+		message_type TEXT NOT NULL,
+		content TEXT,
+		file_id TEXT,
+		file_unique_id TEXT,
+		filename TEXT,
+		mime_type TEXT,
+		created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+		UNIQUE(message_id, chat_id)
+	);
+	CREATE TABLE IF NOT EXISTS bot_responses (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		message_id INTEGER,
+		user_id TEXT NOT NULL,
+		chat_id TEXT NOT NULL,
+		response_type TEXT NOT NULL,
+		content TEXT NOT NULL,
+		created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+	);
+	CREATE TABLE IF NOT EXISTS events (
+		id INTEGER PRIMARY KEY AUTOINCREMENT,
+		message_id INTEGER,
+		user_id TEXT NOT NULL,
+		event_type TEXT NOT NULL,
+		details TEXT,
+		created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+	);
+	CREATE INDEX IF NOT EXISTS idx_messages_user_created ON messages(user_id, created_at DESC);
+	CREATE INDEX IF NOT EXISTS idx_bot_responses_message_id ON bot_responses(message_id);
+	CREATE INDEX IF NOT EXISTS idx_bot_responses_user_created
+		ON bot_responses(user_id, created_at DESC);
+	CREATE INDEX IF NOT EXISTS idx_events_user_created ON events(user_id, created_at DESC);
+	CREATE INDEX IF NOT EXISTS idx_events_user_type_created
+		ON events(user_id, event_type, created_at DESC);
+"""
+_LOG_TABLES = ("messages", "bot_responses", "events")
+
+# Statement texts are module constants so the per-connection statement cache reuses
+# their prepared plans across calls
+_STATEMENT_CACHE_SIZE = 256
+
+_SQL_UPSERT_TRANSCRIPT = """
+	INSERT INTO transcripts (file_hash, language, text, provider, message_id, user_id)
+	VALUES (?, ?, ?, ?, ?, ?)
+	ON CONFLICT(file_hash) DO UPDATE SET
+		language=excluded.language,
+		text=excluded.text,
+		provider=excluded.provider,
+		message_id=COALESCE(excluded.message_id, transcripts.message_id),
+		user_id=COALESCE(excluded.user_id, transcripts.user_id)
+"""
+_SQL_UPSERT_USER_SETTINGS = """
+	INSERT INTO user_settings (user_id, provider, language, mode)
+	VALUES (?, ?, ?, ?)
+	ON CONFLICT(user_id) DO UPDATE SET
+		provider=COALESCE(excluded.provider, user_settings.provider),
+		language=COALESCE(excluded.language, user_settings.language),
+		mode=COALESCE(excluded.mode, user_settings.mode)
+"""
+_SQL_INSERT_MESSAGE = """
+	INSERT INTO messages (
+		message_id, user_id, chat_id, message_type,
+		content, file_id, file_unique_id, filename, mime_type
+	)
+	VALUES (
+		:message_id, :user_id, :chat_id, :message_type,
+		:content, :file_id, :file_unique_id, :filename, :mime_type
+	)
+	ON CONFLICT(message_id, chat_id) DO UPDATE SET
+		content=excluded.content,
+		file_id=excluded.file_id,
+		file_unique_id=excluded.file_unique_id,
+		filename=excluded.filename,
+		mime_type=excluded.mime_type
+"""
+_SQL_INSERT_BOT_RESPONSE = """
+	INSERT INTO bot_responses (message_id, user_id, chat_id, response_type, content)
+	VALUES (:message_id, :user_id, :chat_id, :response_type, :content)
+"""
+_SQL_INSERT_EVENT = """
+	INSERT INTO events (message_id, user_id, event_type, details)
+	VALUES (:message_id, :user_id, :event_type, :details)
+"""
+
+
+@dataclass(slots=True)
 class Storage:
 	config: AppConfig
 
-	def _connect(self) -> sqlite3.Connection:
-		conn = sqlite3.connect(self.config.paths.db_path)
+	# One long-lived connection per database file, opened lazily and shared between
+	# threads under its lock: the main DB (transcripts, user settings) and the log DB
+	# (messages, bot responses, events)
+	_conn: sqlite3.Connection | None = field(default=None, init=False, repr=False)
+	_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+	_log_conn: sqlite3.Connection | None = field(default=None, init=False, repr=False)
+	_log_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+	# Runtime dirs resolved once from config
+	base_dir: Path = field(init=False, repr=False)
+	inbox_dir: Path = field(init=False, repr=False)
+	cache_dir: Path = field(init=False, repr=False)
+	out_dir: Path = field(init=False, repr=False)
+	db_dir: Path = field(init=False, repr=False)
+	db_path: Path = field(init=False, repr=False)
+	log_db_path: Path = field(init=False, repr=False)
+
+	def __post_init__(self) -> None:
+		paths = self.config.paths
+		self.base_dir = Path(paths.base_dir)
+		self.inbox_dir = Path(paths.inbox_dir)
+		self.cache_dir = Path(paths.cache_dir)
+		self.out_dir = Path(paths.out_dir)
+		self.db_path = Path(paths.db_path)
+		self.db_dir = self.db_path.parent
+		self.log_db_path = (
+			Path(paths.log_db_path) if paths.log_db_path else self.db_path.with_name("events.db")
+		)
+		# init_db would take the log tables for legacy ones and drop them
+		if self.log_db_path.resolve() == self.db_path.resolve():
+			raise ValueError(
+				f"paths.log_db_path must differ from paths.db_path: {self.log_db_path}"
+			)
+
+	def _open(self, path: Path) -> sqlite3.Connection:
+		conn = sqlite3.connect(
+			path,
+			check_same_thread=False,
+			cached_statements=_STATEMENT_CACHE_SIZE,
+		)
 		conn.row_factory = sqlite3.Row
+		for pragma in _PRAGMAS:
+			conn.execute(pragma)
 		return conn
 
+	@contextmanager
+	def _connect(self) -> Iterator[sqlite3.Connection]:
+		"""Yield the main DB connection inside a transaction, holding its lock."""
+		with self._lock:
+			if self._conn is None:
+				self._conn = self._open(self.db_path)
+			with self._conn:
+				yield self._conn
+
+	@contextmanager
+	def _connect_log(self) -> Iterator[sqlite3.Connection]:
+		"""Yield the log DB connection inside a transaction, holding its lock.
+
+		SQLite serializes writers per database file, so keeping the frequent log inserts
+		in a separate file lets transcript cache lookups proceed without waiting on them.
+		"""
+		with self._log_lock:
+			if self._log_conn is None:
+				self._log_conn = self._open(self.log_db_path)
+			with self._log_conn:
+				yield self._log_conn
+
+	def close(self) -> None:
+		"""Close the shared connections; they are reopened on next use."""
+		with self._lock:
+			if self._conn is not None:
+				self._conn.close()
+				self._conn = None
+		with self._log_lock:
+			if self._log_conn is not None:
+				self._log_conn.close()
+				self._log_conn = None
+
 	def ensure_runtime_dirs(self) -> None:
-		for path in [
-			Path(self.config.paths.base_dir),
-			Path(self.config.paths.inbox_dir),
-			Path(self.config.paths.cache_dir),
-			Path(self.config.paths.out_dir),
-			Path(self.config.paths.db_path).parent,
-		]:
+		for path in (
+			self.base_dir,
+			self.inbox_dir,
+			self.cache_dir,
+			self.out_dir,
+			self.db_dir,
+			self.log_db_path.parent,
+		):
 			path.mkdir(parents=True, exist_ok=True)
 
 	def init_db(self) -> None:
+		"""Create both schemas, each in one exclusive transaction, and migrate old data.
+
+		Databases from before the log split still hold the log tables; their rows are
+		moved to the log DB.
+		"""
+		with self._connect_log() as conn:
+			conn.executescript(f"BEGIN EXCLUSIVE;\n{_SCHEMA_LOG}\nCOMMIT;")
 		with self._connect() as conn:
-			# Existing tables
-			conn.execute(
-				"""
-				CREATE TABLE IF NOT EXISTS transcripts (
-					id INTEGER PRIMARY KEY AUTOINCREMENT,
-					file_hash TEXT UNIQUE NOT NULL,
-					language TEXT,
-					text TEXT NOT NULL,
-					provider TEXT NOT NULL,
-					message_id INTEGER,
-					user_id TEXT,
-					created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-				)
-				"""
-			)
-			conn.execute(
-				"""
-				CREATE TABLE IF NOT EXISTS user_settings (
-					user_id TEXT PRIMARY KEY,
-					provider TEXT,
-					language TEXT,
-					mode TEXT
+			existing = {row[1] for row in conn.execute("PRAGMA table_info(transcripts)")}
+			legacy_tables = [
+				row[0]
+				for row in conn.execute(
+					"SELECT name FROM sqlite_master WHERE type='table' AND name IN (?, ?, ?)",
+					_LOG_TABLES,
 				)
-				"""
-			)
-			
-			# New tables for message logging
-			conn.execute(
-				"""
-				CREATE TABLE IF NOT EXISTS messages (
-					id INTEGER PRIMARY KEY AUTOINCREMENT,
-					message_id INTEGER NOT NULL,
-					user_id TEXT NOT NULL,
-					chat_id TEXT NOT NULL,
-					message_type TEXT NOT NULL,
-					content TEXT,
-					file_id TEXT,
-					file_unique_id TEXT,
-					filename TEXT,
-					mime_type TEXT,
-					created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-					UNIQUE(message_id, chat_id)
+			]
+			ddl = ["BEGIN EXCLUSIVE;"]
+			# An empty column set means the table is new and CREATE already has every column
+			if existing:
+				ddl.extend(
+					f"ALTER TABLE transcripts ADD COLUMN {name} {sql_type};"
+					for name, sql_type in _TRANSCRIPTS_ADDED_COLUMNS
+					if name not in existing
 				)
-				"""
-			)
-			conn.execute(
-				"""
-				CREATE TABLE IF NOT EXISTS bot_responses (
-					id INTEGER PRIMARY KEY AUTOINCREMENT,
-					message_id INTEGER,
-					user_id TEXT NOT NULL,
-					chat_id TEXT NOT NULL,
-					response_type TEXT NOT NULL,
-					content TEXT NOT NULL,
-					created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-				)
-				"""
-			)
-			conn.execute(
-				"""
-				CREATE TABLE IF NOT EXISTS events (
-					id INTEGER PRIMARY KEY AUTOINCREMENT,
-					message_id INTEGER,
-					user_id TEXT NOT NULL,
-					event_type TEXT NOT NULL,
-					details TEXT,
-					created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-				)
-				"""
-			)
-			
-			# Migrate existing transcripts table if needed
+			ddl.extend((_SCHEMA_MAIN, "COMMIT;"))
+			conn.executescript("\n".join(ddl))
+		if legacy_tables:
+			self._move_legacy_log_tables(legacy_tables)
+
+	def _move_legacy_log_tables(self, tables: list[str]) -> None:
+		"""Copy log tables left in the main DB into the log DB, then drop them.
+
+		Rows keep their ids and are copied with INSERT OR IGNORE, so rerunning after an
+		interruption between the copy and the drop does not duplicate anything.
+		"""
+		with self._connect_log() as conn:
+			conn.execute("ATTACH DATABASE ? AS legacy", (str(self.db_path),))
 			try:
-				cursor = conn.execute("PRAGMA table_info(transcripts)")
-				columns = [row[1] for row in cursor.fetchall()]
-				if "message_id" not in columns:
-					conn.execute("ALTER TABLE transcripts ADD COLUMN message_id INTEGER")
-				if "user_id" not in columns:
-					conn.execute("ALTER TABLE transcripts ADD COLUMN user_id TEXT")
-			except sqlite3.Error:
-				pass  # Table might not exist yet, will be created above
-			
-			# Create indexes for performance
-			conn.execute(
-				"CREATE INDEX IF NOT EXISTS idx_messages_user_id ON messages(user_id)"
-			)
-			conn.execute(
-				"CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages(created_at)"
-			)
-			conn.execute(
-				"CREATE INDEX IF NOT EXISTS idx_bot_responses_message_id ON bot_responses(message_id)"
-			)
-			conn.execute(
-				"CREATE INDEX IF NOT EXISTS idx_bot_responses_user_id ON bot_responses(user_id)"
-			)
-			conn.execute(
-				"CREATE INDEX IF NOT EXISTS idx_events_user_id ON events(user_id)"
-			)
-			conn.execute(
-				"CREATE INDEX IF NOT EXISTS idx_events_event_type ON events(event_type)"
-			)
-			conn.execute(
-				"CREATE INDEX IF NOT EXISTS idx_transcripts_user_id ON transcripts(user_id)"
+				for table in tables:
+					# Same CREATE statement on both sides, so the column order matches
+					conn.execute(f"INSERT OR IGNORE INTO {table} SELECT * FROM legacy.{table}")
+				conn.commit()
+			except BaseException:
+				# DETACH is refused while a transaction is open
+				conn.rollback()
+				raise
+			finally:
+				conn.execute("DETACH DATABASE legacy")
+		with self._connect() as conn:
+			conn.executescript(
+				"BEGIN;\n"
+				+ "".join(f"DROP TABLE IF EXISTS {table};\n" for table in tables)
+				+ "COMMIT;"
 			)
 
 	def get_transcript(self, file_hash: str) -> dict | None:
@@ -154,16 +303,7 @@ class Storage:
 	) -> None:
 		with self._connect() as conn:
 			conn.execute(
-				"""
-				INSERT INTO transcripts (file_hash, language, text, provider, message_id, user_id)
-				VALUES (?, ?, ?, ?, ?, ?)
-				ON CONFLICT(file_hash) DO UPDATE SET
-					language=excluded.language,
-					text=excluded.text,
-					provider=excluded.provider,
-					message_id=COALESCE(excluded.message_id, transcripts.message_id),
-					user_id=COALESCE(excluded.user_id, transcripts.user_id)
-				""",
+				_SQL_UPSERT_TRANSCRIPT,
 				(file_hash, language, text, provider, message_id, user_id),
 			)
 
@@ -185,14 +325,7 @@ class Storage:
 	) -> None:
 		with self._connect() as conn:
 			conn.execute(
-				"""
-				INSERT INTO user_settings (user_id, provider, language, mode)
-				VALUES (?, ?, ?, ?)
-				ON CONFLICT(user_id) DO UPDATE SET
-					provider=COALESCE(excluded.provider, user_settings.provider),
-					language=COALESCE(excluded.language, user_settings.language),
-					mode=COALESCE(excluded.mode, user_settings.mode)
-				""",
+				_SQL_UPSERT_USER_SETTINGS,
 				(user_id, provider, language, mode),
 			)
 
@@ -210,33 +343,21 @@ class Storage:
 		mime_type: str | None = None,
 	) -> None:
 		"""Save incoming message to database."""
-		with self._connect() as conn:
-			conn.execute(
-				"""
-				INSERT INTO messages (
-					message_id, user_id, chat_id, message_type,
-					content, file_id, file_unique_id, filename, mime_type
-				)
-				VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-				ON CONFLICT(message_id, chat_id) DO UPDATE SET
-					content=excluded.content,
-					file_id=excluded.file_id,
-					file_unique_id=excluded.file_unique_id,
-					filename=excluded.filename,
-					mime_type=excluded.mime_type
-				""",
-				(
-					message_id,
-					user_id,
-					chat_id,
-					message_type,
-					content,
-					file_id,
-					file_unique_id,
-					filename,
-					mime_type,
-				),
-			)
+		self.save_batch(
+			messages=[
+				{
+					"message_id": message_id,
+					"user_id": user_id,
+					"chat_id": chat_id,
+					"message_type": message_type,
+					"content": content,
+					"file_id": file_id,
+					"file_unique_id": file_unique_id,
+					"filename": filename,
+					"mime_type": mime_type,
+				}
+			]
+		)
 
 	def save_bot_response(
 		self,
@@ -248,16 +369,17 @@ class Storage:
 		content: str,
 	) -> None:
 		"""Save bot response to database."""
-		with self._connect() as conn:
-			conn.execute(
-				"""
-				INSERT INTO bot_responses (
-					message_id, user_id, chat_id, response_type, content
-				)
-				VALUES (?, ?, ?, ?, ?)
-				""",
-				(message_id, user_id, chat_id, response_type, content),
-			)
+		self.save_batch(
+			bot_responses=[
+				{
+					"message_id": message_id,
+					"user_id": user_id,
+					"chat_id": chat_id,
+					"response_type": response_type,
+					"content": content,
+				}
+			]
+		)
 
 	def save_event(
 		self,
@@ -268,18 +390,37 @@ class Storage:
 		details: str | None = None,
 	) -> None:
 		"""Save event/action to database."""
-		with self._connect() as conn:
-			conn.execute(
-				"""
-				INSERT INTO events (message_id, user_id, event_type, details)
-				VALUES (?, ?, ?, ?)
-				""",
-				(message_id, user_id, event_type, details),
-			)
+		self.save_batch(
+			events=[
+				{
+					"message_id": message_id,
+					"user_id": user_id,
+					"event_type": event_type,
+					"details": details,
+				}
+			]
+		)
+
+	def save_batch(
+		self,
+		*,
+		messages: Iterable[dict] = (),
+		bot_responses: Iterable[dict] = (),
+		events: Iterable[dict] = (),
+	) -> None:
+		"""Insert rows into the logging tables in one transaction via executemany.
+
+		Rows are dicts keyed like the ``save_message``/``save_bot_response``/``save_event``
+		arguments.
+		"""
+		with self._connect_log() as conn:
+			conn.executemany(_SQL_INSERT_MESSAGE, messages)
+			conn.executemany(_SQL_INSERT_BOT_RESPONSE, bot_responses)
+			conn.executemany(_SQL_INSERT_EVENT, events)
 
 	def get_message_by_id(self, message_id: int, chat_id: str) -> dict | None:
 		"""Get message by message_id and chat_id."""
-		with self._connect() as conn:
+		with self._connect_log() as conn:
 			row = conn.execute(
 				"""
 				SELECT id, message_id, user_id, chat_id, message_type,
@@ -295,7 +436,7 @@ class Storage:
 		self, user_id: str, limit: int = 100, offset: int = 0
 	) -> list[dict]:
 		"""Get user messages ordered by created_at DESC."""
-		with self._connect() as conn:
+		with self._connect_log() as conn:
 			rows = conn.execute(
 				"""
 				SELECT id, message_id, user_id, chat_id, message_type,
@@ -313,7 +454,7 @@ class Storage:
 		self, user_id: str, limit: int = 100, offset: int = 0
 	) -> list[dict]:
 		"""Get bot responses for user ordered by created_at DESC."""
-		with self._connect() as conn:
+		with self._connect_log() as conn:
 			rows = conn.execute(
 				"""
 				SELECT id, message_id, user_id, chat_id, response_type, content, created_at
@@ -330,7 +471,7 @@ class Storage:
 		self, user_id: str, event_type: str | None = None, limit: int = 100, offset: int = 0
 	) -> list[dict]:
 		"""Get user events ordered by created_at DESC."""
-		with self._connect() as conn:
+		with self._connect_log() as conn:
 			if event_type:
 				rows = conn.execute(
 					"""
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+from src.core.storage import Storage
+
+logger = logging.getLogger(__name__)
+
+_TABLES = ("messages", "bot_responses", "events")
+
+
+class AsyncWriteBuffer:
+	"""Collects logging rows in memory and writes them to storage in batches.
+
+	Rows are flushed in one transaction when ``max_batch`` rows are pending or
+	``max_delay`` seconds have passed since the first pending row, whichever comes first.
+	"""
+
+	def __init__(self, storage: Storage, *, max_batch: int = 200, max_delay: float = 0.05) -> None:
+		self.storage = storage
+		self.max_batch = max_batch
+		self.max_delay = max_delay
+		self._rows: dict[str, list[dict[str, Any]]] = {table: [] for table in _TABLES}
+		self._size = 0
+		self._has_rows = asyncio.Event()
+		self._is_full = asyncio.Event()
+		self._task: asyncio.Task[None] | None = None
+		self._closed = False
+		# One dedicated writer thread: batches never queue behind other to_thread work
+		# in the default executor, and writes stay serialized on the shared connection
+		self._executor = concurrent.futures.ThreadPoolExecutor(
+			max_workers=1, thread_name_prefix="db-writer"
+		)
+
+	def enqueue(self, table: str, row: dict[str, Any]) -> None:
+		"""Add a row for ``messages``, ``bot_responses`` or ``events``; never blocks."""
+		self.enqueue_many(table, (row,))
+
+	def enqueue_many(self, table: str, rows: Iterable[dict[str, Any]]) -> None:
+		"""Add several rows for one table at once; never blocks.
+
+		Rows arriving after close() (handlers still finishing during shutdown) are
+		logged and dropped: logging must never fail the handler that produced them.
+		"""
+		if self._closed:
+			rows = list(rows)
+			if rows:
+				logger.warning("Write buffer closed, dropping %d %s row(s)", len(rows), table)
+			return
+		pending = self._rows[table]
+		before = len(pending)
+		pending.extend(rows)
+		added = len(pending) - before
+		if not added:
+			return
+		self._size += added
+		self._has_rows.set()
+		if self._size >= self.max_batch:
+			self._is_full.set()
+		if self._task is None or self._task.done():
+			self._task = asyncio.create_task(self._flush_loop())
+
+	def _take(self) -> dict[str, list[dict[str, Any]]]:
+		rows = self._rows
+		self._rows = {table: [] for table in _TABLES}
+		self._size = 0
+		self._has_rows.clear()
+		self._is_full.clear()
+		return rows
+
+	async def _write(self, rows: dict[str, list[dict[str, Any]]]) -> None:
+		loop = asyncio.get_running_loop()
+		await loop.run_in_executor(
+			self._executor, functools.partial(self.storage.save_batch, **rows)
+		)
+
+	async def _flush_loop(self) -> None:
+		while True:
+			await self._has_rows.wait()
+			with contextlib.suppress(asyncio.TimeoutError):
+				await asyncio.wait_for(self._is_full.wait(), self.max_delay)
+			rows = self._take()
+			try:
+				await self._write(rows)
+			except Exception as exc:
+				logger.warning("Error writing batch to database: %s", exc)
+
+	async def close(self) -> None:
+		"""Stop the background writer, flush pending rows and drop any new ones."""
+		self._closed = True
+		if self._task is not None:
+			self._task.cancel()
+			with contextlib.suppress(asyncio.CancelledError):
+				await self._task
+			self._task = None
+		# Rows left after cancelling go through the writer thread like any other batch;
+		# shutdown(wait=True) also lets a batch interrupted by the cancel finish
+		if self._size:
+			try:
+				await self._write(self._take())
+			except Exception as exc:
+				logger.warning("Error writing batch on shutdown: %s", exc)
+		self._executor.shutdown(wait=True)
@@ -2,10 +2,21 @@ from __future__ import annotations
 
 import shutil
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 
 from src.core.config import AppConfig
 
+# Directories already created by this process; the cache dir is shared by every
+# conversion, so it only needs one mkdir per process
+_ENSURED_DIRS: set[Path] = set()
+
+
+def _ensure_dir(path: Path) -> None:
+	if path not in _ENSURED_DIRS:
+		path.mkdir(parents=True, exist_ok=True)
+		_ENSURED_DIRS.add(path)
+
 
 def _resolve_bin(executable: str, ffmpeg_bin: str | None) -> str:
 	"""Resolve ffmpeg/ffprobe binary path considering configured ffmpeg_bin."""
@@ -34,7 +45,7 @@ def convert_to_wav_16k_mono(input_path: Path, output_path: Path, *, ffmpeg_bin:
 		output_path: destination .wav path.
 		ffmpeg_bin: explicit ffmpeg path or None to use PATH.
 	"""
-	output_path.parent.mkdir(parents=True, exist_ok=True)
+	_ensure_dir(output_path.parent)
 	cmd = [
 		_resolve_bin("ffmpeg", ffmpeg_bin),
 		"-y",
@@ -57,7 +68,6 @@ def convert_to_wav_16k_mono(input_path: Path, output_path: Path, *, ffmpeg_bin:
 
 def ensure_wav_16k_mono(src_path: Path, *, config: AppConfig, dst_dir: Path) -> Path:
 	"""Ensure input audio is converted to WAV 16kHz mono in dst_dir; return converted path."""
-	dst_dir.mkdir(parents=True, exist_ok=True)
 	out_path = dst_dir / (src_path.stem + "_16k_mono.wav")
 	return convert_to_wav_16k_mono(src_path, out_path, ffmpeg_bin=config.paths.ffmpeg_bin)
 
@@ -81,6 +91,7 @@ def probe_duration_seconds(path: Path, *, ffmpeg_bin: str | None) -> float:
 		raise RuntimeError(f"Не удалось определить длительность файла {path}") from exc
 
 
+@lru_cache(maxsize=1024)
 def safe_stem(name: str) -> str:
 	"""Return filesystem-safe stem for filename (without extension)."""
 	invalid = '<>:"/\\|?*'
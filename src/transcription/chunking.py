@@ -18,11 +18,11 @@ def segment_wav_by_time(
 
 	Returns paths to created segments in order. If input shorter than max_sec, returns [input].
 	"""
-	output_dir.mkdir(parents=True, exist_ok=True)
 	duration = probe_duration_seconds(input_wav, ffmpeg_bin=ffmpeg_bin)
 	if duration <= max_sec + 0.5:
 		return [input_wav]
 
+	output_dir.mkdir(parents=True, exist_ok=True)
 	segments: list[Path] = []
 	out_template = output_dir / (input_wav.stem + "_part_%03d.wav")
 	cmd = [
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import concurrent.futures
 import logging
-from dataclasses import dataclass
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Protocol
 
@@ -30,6 +32,18 @@ class TranscriptionRouter:
 	# Providers (lazy)
 	local_provider: TranscriptionProvider | None = None
 	cloud_provider: TranscriptionProvider | None = None
+	# Transcript cache storage (lazy); keeps one DB connection for all calls
+	storage: Storage | None = None
+	# Resolved once; transcribe() used to rebuild the Path on every call
+	cache_dir: Path = field(init=False, repr=False)
+
+	def __post_init__(self) -> None:
+		self.cache_dir = Path(self.config.paths.cache_dir)
+
+	def _get_storage(self) -> Storage:
+		if self.storage is None:
+			self.storage = Storage(self.config)
+		return self.storage
 
 	def _get_local(self) -> TranscriptionProvider:
 		if self.local_provider is None:
@@ -42,30 +56,41 @@ class TranscriptionRouter:
 		return self.cloud_provider
 
 	def _run_with_timeout(self, func, *, timeout: int):
-		with concurrent.futures.ThreadPoolExecutor(max_workers=1) as ex:
-			fut = ex.submit(func)
-			return fut.result(timeout=timeout)
+		ex = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+		try:
+			return ex.submit(func).result(timeout=timeout)
+		finally:
+			# Do not wait for a timed-out call: its thread finishes in the background
+			ex.shutdown(wait=False)
 
 	def _call_provider_with_timeout(self, provider: TranscriptionProvider, wav: Path, timeout: int):
 		return self._run_with_timeout(lambda: provider.transcribe(wav), timeout=timeout)
 
 	def transcribe(
-		self, src_audio_path: Path, message_id: int | None = None, user_id: str | None = None
+		self,
+		src_audio_path: Path,
+		message_id: int | None = None,
+		user_id: str | None = None,
+		*,
+		on_part: Callable[[str], None] | None = None,
 	) -> TranscriptionResult:
 		"""Convert to wav 16k mono, optionally chunk, then transcribe via selected provider.
 
 		Fallback: if default provider fails or times out, and fallback=cloud -> try cloud.
+		on_part, if given, receives the text of each audio chunk as soon as it is ready,
+		from the worker thread. The fallback only transcribes chunks not done yet, so each
+		chunk is reported once and the result is the reported text. Cache hits report nothing.
 		"""
 		logger.info(f"Starting transcription for: {src_audio_path.name}")
 		
 		# Normalize to wav 16k mono
 		wav = ensure_wav_16k_mono(
-			src_audio_path, config=self.config, dst_dir=Path(self.config.paths.cache_dir)
+			src_audio_path, config=self.config, dst_dir=self.cache_dir
 		)
 		logger.debug(f"Normalized audio to: {wav}")
 
 		# Cache check (by normalized wav bytes)
-		storage = Storage(self.config)
+		storage = self._get_storage()
 		file_hash = sha256_of_file(wav)
 		cached = storage.get_transcript(file_hash)
 		if cached:
@@ -84,18 +109,40 @@ class TranscriptionRouter:
 		chunks = segment_wav_by_time(
 			wav,
 			max_sec=self.config.chunk.max_sec,
-			output_dir=Path(self.config.paths.cache_dir) / (wav.stem + "_chunks"),
+			output_dir=self.cache_dir / (wav.stem + "_chunks"),
 			ffmpeg_bin=self.config.paths.ffmpeg_bin,
 		)
 		logger.debug(f"Audio split into {len(chunks)} chunk(s)")
 
-		def transcribe_all(provider: TranscriptionProvider) -> TranscriptionResult:
+		# Chunk results accepted so far, in order, and the attempt allowed to add more.
+		# A failed or timed-out attempt is retired: its thread (which keeps running after
+		# a timeout) adds nothing more, and the fallback resumes after the accepted chunks,
+		# so the final transcript is exactly the text passed to on_part
+		done: list[TranscriptionResult] = []
+		attempt = 0
+		report_lock = threading.Lock()
+
+		def is_retired(attempt_no: int) -> bool:
+			with report_lock:
+				return attempt_no != attempt
+
+		def accept(attempt_no: int, res: TranscriptionResult) -> bool:
+			"""Record and report the next chunk result; False if the attempt is retired."""
+			with report_lock:
+				if attempt_no != attempt:
+					return False
+				done.append(res)
+				part = res.text.strip() if res.text else ""
+				if part and on_part is not None:
+					on_part(part)
+				return True
+
+		def merge(results: list[TranscriptionResult]) -> TranscriptionResult:
 			all_segments: list[TranscriptionSegment] = []
 			all_text_parts: list[str] = []
 			language: str | None = None
 			offset = 0.0
-			for ch in chunks:
-				res = provider.transcribe(ch)
+			for res in results:
 				if language is None and res.language:
 					language = res.language
 				# Offset segments to original timeline
@@ -105,21 +152,44 @@ class TranscriptionRouter:
 							start=s.start + offset, end=s.end + offset, text=s.text
 						)
 					)
-				if res.text:
+				part = res.text.strip() if res.text else ""
+				if part:
 					# separate chunks by space
-					all_text_parts.append(res.text.strip())
+					all_text_parts.append(part)
 				# update offset using last segment if present
 				if res.segments:
 					offset = all_segments[-1].end
 				else:
 					# fallback to rough estimation: average duration per chunk
 					offset += self.config.chunk.max_sec
-			text = " ".join(t for t in all_text_parts if t)
+			text = " ".join(all_text_parts)
 			return TranscriptionResult(
 				text=text, language=language, segments=all_segments, provider=""
 			)
 
+		def transcribe_all(
+			provider: TranscriptionProvider, attempt_no: int
+		) -> TranscriptionResult | None:
+			with report_lock:
+				start = len(done)
+			if start:
+				logger.info(f"Resuming from chunk {start + 1} of {len(chunks)}")
+			for ch in chunks[start:]:
+				# A timed-out attempt stops at the next chunk: the provider (a single local
+				# model) is free again for the next job, and stray threads do not pile up
+				if is_retired(attempt_no):
+					return None
+				if not accept(attempt_no, provider.transcribe(ch)):
+					return None
+			with report_lock:
+				results = list(done)
+			return merge(results)
+
 		def try_with(provider_name: str) -> TranscriptionResult:
+			nonlocal attempt
+			with report_lock:
+				attempt += 1
+				attempt_no = attempt
 			if provider_name == "local":
 				prov = self._get_local()
 				timeout = self.config.timeouts.local_sec
@@ -129,7 +199,16 @@ class TranscriptionRouter:
 			
 			logger.info(f"Transcribing with {provider_name} provider (timeout: {timeout}s)")
 			# run the transcription (possibly long) with timeout protection
-			res = self._run_with_timeout(lambda: transcribe_all(prov), timeout=timeout)
+			try:
+				res = self._run_with_timeout(
+					lambda: transcribe_all(prov, attempt_no), timeout=timeout
+				)
+			except BaseException:
+				# Retire the attempt: after a timeout its thread is still transcribing
+				with report_lock:
+					if attempt == attempt_no:
+						attempt += 1
+				raise
 			# fill provider name on result
 			if provider_name == "cloud":
 				res.provider = prov.config.cloud.model
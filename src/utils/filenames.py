@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+
+def file_ext(name: str, default: str = "") -> str:
+	"""Return lower-cased extension of name without the dot, or default if there is none."""
+	dot = name.rfind(".")
+	return name[dot + 1 :].lower() if dot >= 0 else default
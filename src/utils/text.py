@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import textwrap
+
+
+def split_text(text: str, width: int, *, max_len: int | None = None) -> list[str]:
+	"""Split text into chunks of at most width chars, breaking between words where possible.
+
+	Newlines are kept; words longer than width are cut. If max_len is given, a short
+	last chunk is merged into the previous one when the result still fits max_len,
+	so a long transcript does not end with a tiny extra message.
+	"""
+	chunks = textwrap.wrap(
+		text,
+		width=width,
+		expand_tabs=False,
+		replace_whitespace=False,
+		break_on_hyphens=False,
+	)
+	if not chunks:
+		return [text]
+	if max_len is not None and len(chunks) > 1 and len(chunks[-2]) + 1 + len(chunks[-1]) <= max_len:
+		chunks[-2:] = [chunks[-2] + " " + chunks[-1]]
+	return chunks
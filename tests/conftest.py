@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from src.core.config import AppConfig, Paths
+from src.core.storage import Storage
+
+
+@pytest.fixture
+def make_storage(tmp_path: Path) -> Callable[[], Storage]:
+	"""Factory for an initialized Storage under tmp_path/var; for tests that prepare files first."""
+
+	def make() -> Storage:
+		base = tmp_path / "var"
+		paths = Paths(
+			ffmpeg_bin=None,
+			base_dir=str(base),
+			inbox_dir=str(base / "inbox"),
+			cache_dir=str(base / "cache"),
+			out_dir=str(base / "out"),
+			db_path=str(base / "db" / "app.db"),
+		)
+		storage = Storage(AppConfig(paths=paths))
+		storage.ensure_runtime_dirs()
+		storage.init_db()
+		return storage
+
+	return make
+
+
+@pytest.fixture
+def storage(make_storage: Callable[[], Storage]) -> Storage:
+	return make_storage()
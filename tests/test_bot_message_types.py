@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from aiogram.types import PhotoSize
+
+from src.bot.message_types import extract_message_info
+
+_ATTRS = (
+	"text",
+	"voice",
+	"audio",
+	"video",
+	"video_note",
+	"photo",
+	"sticker",
+	"animation",
+	"document",
+)
+
+
+def _message(**kwargs) -> SimpleNamespace:
+	fields = {attr: None for attr in _ATTRS}
+	fields["caption"] = None
+	fields.update(kwargs)
+	return SimpleNamespace(**fields)
+
+
+def test_extract_text_and_command():
+	assert extract_message_info(_message(text="hello")).message_type == "text"
+	info = extract_message_info(_message(text="/start"))
+	assert info.message_type == "command"
+	assert info.content == "/start"
+
+
+def test_extract_voice():
+	voice = SimpleNamespace(file_id="f1", file_unique_id="u1")
+	info = extract_message_info(_message(voice=voice))
+	assert info.message_type == "voice"
+	assert info.file_id == "f1"
+	assert info.filename == "voice_u1.ogg"
+	assert info.mime_type == "audio/ogg"
+
+
+def test_extract_photo_picks_largest_size():
+	small = PhotoSize(file_id="s", file_unique_id="us", width=90, height=90)
+	large = PhotoSize(file_id="l", file_unique_id="ul", width=800, height=600)
+	info = extract_message_info(_message(photo=[small, large], caption="cap"))
+	assert info.message_type == "photo"
+	assert info.file_id == "l"
+	assert info.filename == "photo_ul.jpg"
+	assert info.mime_type == "image/jpeg"
+	assert info.content == "cap"
+
+
+def test_extract_animation_wins_over_document():
+	animation = SimpleNamespace(
+		file_id="a", file_unique_id="ua", file_name=None, mime_type="video/mp4"
+	)
+	document = SimpleNamespace(
+		file_id="a", file_unique_id="ua", file_name="anim.mp4", mime_type="video/mp4"
+	)
+	info = extract_message_info(_message(animation=animation, document=document))
+	assert info.message_type == "animation"
+	assert info.filename == "animation_ua.gif"
+
+
+def test_extract_unsupported_message_returns_none():
+	assert extract_message_info(_message()) is None
+
+
+def test_extract_sticker_extension_from_mime_type():
+	sticker = SimpleNamespace(file_id="s", file_unique_id="us", mime_type="video/webm")
+	assert extract_message_info(_message(sticker=sticker)).filename == "sticker_us.webm"
+
+	sticker = SimpleNamespace(file_id="s", file_unique_id="us", mime_type=None)
+	info = extract_message_info(_message(sticker=sticker))
+	assert info.filename == "sticker_us.webp"
+	assert info.mime_type == "image/webp"
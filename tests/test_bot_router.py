@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from aiogram.types import Chat, Document, Message, User, Voice
+
+from src.bot.router import _MSG_PREFIX_AUDIO, _MSG_PROC_AUDIO, _write_json, get_router
+from src.core.write_buffer import AsyncWriteBuffer
+from src.domain.models import TranscriptionResult
+
+
+def _document_message(message_id: int) -> Message:
+	return Message(
+		message_id=message_id,
+		date=datetime(2024, 1, 1),
+		chat=Chat(id=1, type="private"),
+		from_user=User(id=1, is_bot=False, first_name="u"),
+		document=Document(
+			file_id="file-id",
+			file_unique_id="unique-id",
+			file_name="report.pdf",
+			mime_type="application/pdf",
+		),
+	)
+
+
+class _FlakyBot:
+	"""First download waits for a signal and fails; later downloads succeed."""
+
+	def __init__(self) -> None:
+		self.downloads = 0
+		self.release_first = asyncio.Event()
+
+	async def get_file(self, file_id):
+		return SimpleNamespace(file_path=f"documents/{file_id}")
+
+	async def download_file(self, file_path, destination, **_kwargs):
+		self.downloads += 1
+		if self.downloads == 1:
+			await self.release_first.wait()
+			raise RuntimeError("network error")
+		Path(destination).write_bytes(b"payload")
+
+
+def test_inbox_resend_downloads_again_after_failed_concurrent_download(storage):
+	async def run() -> None:
+		write_buffer = AsyncWriteBuffer(storage)
+		router = get_router(config=storage.config, storage=storage, write_buffer=write_buffer)
+		on_message = router.message.handlers[-1].callback
+		bot = _FlakyBot()
+
+		first = asyncio.create_task(on_message(_document_message(1), bot))
+		await asyncio.sleep(0)
+		# Same file arrives while the first download is still in progress
+		await on_message(_document_message(2), bot)
+		bot.release_first.set()
+		await first
+
+		await on_message(_document_message(3), bot)
+		await write_buffer.close()
+
+		assert bot.downloads == 2
+		assert (storage.inbox_dir / "report.pdf").read_bytes() == b"payload"
+
+	asyncio.run(run())
+
+
+def test_write_json_concurrent_writes_to_same_path(tmp_path):
+	path = tmp_path / "audio_transcript.json"
+	payloads = [{"text": str(i) * 100_000} for i in range(8)]
+
+	with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+		list(pool.map(functools.partial(_write_json, path), payloads))
+
+	assert json.loads(path.read_text(encoding="utf-8")) in payloads
+	assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+def test_write_json_removes_temp_file_on_failure(tmp_path, monkeypatch):
+	def fail_replace(*_args):
+		raise OSError("disk full")
+
+	monkeypatch.setattr("src.bot.router.os.replace", fail_replace)
+	with pytest.raises(OSError, match="disk full"):
+		_write_json(tmp_path / "audio_transcript.json", {"text": "t"})
+
+	assert list(tmp_path.iterdir()) == []
+
+
+class _Bot:
+	async def get_file(self, file_id):
+		return SimpleNamespace(file_path=f"voice/{file_id}")
+
+	async def download_file(self, file_path, destination, **_kwargs):
+		Path(destination).write_bytes(b"ogg")
+
+
+class _FakeTranscriber:
+	"""Reports parts through on_part like chunked audio, then returns text (default: parts)."""
+
+	def __init__(self, parts: list[str], text: str | None = None) -> None:
+		self.parts = parts
+		self.text = " ".join(parts) if text is None else text
+		self.first_piece_sent = threading.Event()
+		self.sent_while_running = False
+
+	def transcribe(self, src_path, message_id=None, user_id=None, *, on_part=None):
+		for part in self.parts:
+			if on_part is not None:
+				on_part(part)
+		if self.parts:
+			self.sent_while_running = self.first_piece_sent.wait(timeout=5)
+		return TranscriptionResult(text=self.text, language="ru", provider="local:faster-whisper")
+
+
+def _run_voice(storage, monkeypatch, transcriber, *, fail_first_transcript_send=False):
+	"""Handle one voice message; returns the answered texts after the processing notice."""
+	answers: list[str] = []
+	failures = [RuntimeError("Telegram is down")] if fail_first_transcript_send else []
+
+	async def answer(self, text, **_kwargs):
+		if text.startswith(_MSG_PREFIX_AUDIO):
+			transcriber.first_piece_sent.set()
+			if failures:
+				raise failures.pop()
+		answers.append(text)
+
+	monkeypatch.setattr(Message, "answer", answer)
+	monkeypatch.setattr("src.bot.router.TranscriptionRouter", lambda config: transcriber)
+	message = Message(
+		message_id=1,
+		date=datetime(2024, 1, 1),
+		chat=Chat(id=1, type="private"),
+		from_user=User(id=1, is_bot=False, first_name="u"),
+		voice=Voice(file_id="voice-id", file_unique_id="v1", duration=60),
+	)
+
+	async def run() -> None:
+		write_buffer = AsyncWriteBuffer(storage)
+		router = get_router(config=storage.config, storage=storage, write_buffer=write_buffer)
+		await router.message.handlers[-1].callback(message, _Bot())
+		await write_buffer.close()
+
+	asyncio.run(run())
+	assert answers[0] == _MSG_PROC_AUDIO
+	return answers[1:]
+
+
+def _sent_text(pieces: list[str]) -> str:
+	"""Transcript rebuilt from sent pieces: prefix and quotes wrap the first one."""
+	first = pieces[0].removeprefix(_MSG_PREFIX_AUDIO)
+	assert first.startswith("'") and first.endswith("'")
+	return " ".join([first[1:-1], *pieces[1:]])
+
+
+def _event_types(storage) -> set[str]:
+	return {e["event_type"] for e in storage.get_user_events(user_id="1")}
+
+
+def test_voice_transcript_is_streamed_then_tail_sent(storage, monkeypatch):
+	parts = [" ".join([f"w{i}"] * 700) for i in range(3)]
+	transcriber = _FakeTranscriber(parts)
+
+	pieces = _run_voice(storage, monkeypatch, transcriber)
+
+	assert transcriber.sent_while_running
+	assert len(pieces) >= 2
+	assert all(len(p) <= 4096 for p in pieces)
+	assert _sent_text(pieces) == transcriber.text
+	assert "transcription_success" in _event_types(storage)
+	saved = json.loads(next(storage.out_dir.glob("*_transcript.json")).read_text("utf-8"))
+	assert saved["transcription"]["text"] == transcriber.text
+
+
+def test_voice_short_or_cached_transcript_is_sent_whole(storage, monkeypatch):
+	pieces = _run_voice(storage, monkeypatch, _FakeTranscriber([], text="cached text"))
+
+	assert pieces == [f"{_MSG_PREFIX_AUDIO}'cached text'"]
+
+
+def test_voice_failed_stream_send_is_not_a_transcription_error(storage, monkeypatch):
+	parts = [" ".join([f"w{i}"] * 700) for i in range(3)]
+	transcriber = _FakeTranscriber(parts)
+
+	pieces = _run_voice(storage, monkeypatch, transcriber, fail_first_transcript_send=True)
+
+	# Streaming stops at the failed send; the whole transcript is then sent again
+	assert not any(p.startswith("Ошибка") for p in pieces)
+	assert _sent_text(pieces) == transcriber.text
+	events = _event_types(storage)
+	assert "transcription_success" in events
+	assert "transcription_error" not in events
+	assert list(storage.out_dir.glob("*_transcript.json"))
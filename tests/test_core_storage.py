@@ -1,30 +1,14 @@
 from __future__ import annotations
 
-from pathlib import Path
+import sqlite3
+
+import pytest
 
 from src.core.config import AppConfig, Paths
 from src.core.storage import Storage
 
 
-def _make_storage(tmp_path: Path) -> Storage:
-	base = tmp_path / "var"
-	paths = Paths(
-		ffmpeg_bin=None,
-		base_dir=str(base),
-		inbox_dir=str(base / "inbox"),
-		cache_dir=str(base / "cache"),
-		out_dir=str(base / "out"),
-		db_path=str(base / "db" / "app.db"),
-	)
-	cfg = AppConfig(paths=paths)
-	storage = Storage(cfg)
-	storage.ensure_runtime_dirs()
-	storage.init_db()
-	return storage
-
-
-def test_storage_transcript_upsert(tmp_path):
-	storage = _make_storage(tmp_path)
+def test_storage_transcript_upsert(storage):
 	file_hash = "abc123"
 
 	storage.save_transcript(file_hash=file_hash, language="en", text="hello", provider="local")
@@ -42,9 +26,7 @@ def test_storage_transcript_upsert(tmp_path):
 	assert row["provider"] == "cloud"
 
 
-def test_storage_user_settings_upsert(tmp_path):
-	storage = _make_storage(tmp_path)
-
+def test_storage_user_settings_upsert(storage):
 	storage.upsert_user_settings(user_id="u1", provider="local", language="ru", mode="voice")
 	row = storage.get_user_settings("u1")
 	assert row is not None
@@ -61,9 +43,7 @@ def test_storage_user_settings_upsert(tmp_path):
 	assert row["mode"] == "voice"
 
 
-def test_storage_save_message(tmp_path):
-	storage = _make_storage(tmp_path)
-	
+def test_storage_save_message(storage):
 	storage.save_message(
 		message_id=123,
 		user_id="u1",
@@ -81,9 +61,7 @@ def test_storage_save_message(tmp_path):
 	assert msg["content"] == "Hello"
 
 
-def test_storage_save_message_with_file(tmp_path):
-	storage = _make_storage(tmp_path)
-	
+def test_storage_save_message_with_file(storage):
 	storage.save_message(
 		message_id=456,
 		user_id="u2",
@@ -104,9 +82,7 @@ def test_storage_save_message_with_file(tmp_path):
 	assert msg["mime_type"] == "audio/ogg"
 
 
-def test_storage_save_bot_response(tmp_path):
-	storage = _make_storage(tmp_path)
-	
+def test_storage_save_bot_response(storage):
 	storage.save_bot_response(
 		message_id=123,
 		user_id="u1",
@@ -122,9 +98,7 @@ def test_storage_save_bot_response(tmp_path):
 	assert responses[0]["content"] == "Response text"
 
 
-def test_storage_save_event(tmp_path):
-	storage = _make_storage(tmp_path)
-	
+def test_storage_save_event(storage):
 	storage.save_event(
 		message_id=123,
 		user_id="u1",
@@ -138,9 +112,7 @@ def test_storage_save_event(tmp_path):
 	assert events[0]["details"] is None
 
 
-def test_storage_save_event_with_details(tmp_path):
-	storage = _make_storage(tmp_path)
-	
+def test_storage_save_event_with_details(storage):
 	storage.save_event(
 		message_id=456,
 		user_id="u2",
@@ -154,9 +126,7 @@ def test_storage_save_event_with_details(tmp_path):
 	assert events[0]["details"] == '{"provider": "local", "language": "en"}'
 
 
-def test_storage_get_user_messages(tmp_path):
-	storage = _make_storage(tmp_path)
-	
+def test_storage_get_user_messages(storage):
 	# Save multiple messages
 	for i in range(5):
 		storage.save_message(
@@ -179,9 +149,7 @@ def test_storage_get_user_messages(tmp_path):
 		assert msg["message_type"] == "text"
 
 
-def test_storage_transcript_with_message_id(tmp_path):
-	storage = _make_storage(tmp_path)
-	
+def test_storage_transcript_with_message_id(storage):
 	storage.save_transcript(
 		file_hash="hash123",
 		language="en",
@@ -194,4 +162,128 @@ def test_storage_transcript_with_message_id(tmp_path):
 	row = storage.get_transcript("hash123")
 	assert row is not None
 	assert row["message_id"] == 789
-	assert row["user_id"] == "u1"
\ No newline at end of file
+	assert row["user_id"] == "u1"
+
+
+def test_storage_save_batch_messages(storage):
+	rows = [
+		{
+			"message_id": 200 + i,
+			"user_id": "u3",
+			"chat_id": "c1",
+			"message_type": "text",
+			"content": f"Batch {i}",
+			"file_id": None,
+			"file_unique_id": None,
+			"filename": None,
+			"mime_type": None,
+		}
+		for i in range(3)
+	]
+	storage.save_batch(messages=rows)
+
+	messages = storage.get_user_messages(user_id="u3", limit=10)
+	assert {msg["message_id"] for msg in messages} == {200, 201, 202}
+	assert storage.get_message_by_id(message_id=201, chat_id="c1")["content"] == "Batch 1"
+
+
+def test_storage_reuses_single_wal_connection(storage):
+	with storage._connect() as conn:
+		first = conn
+		assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+	with storage._connect() as conn:
+		assert conn is first
+
+	storage.close()
+	storage.save_event(message_id=1, user_id="u1", event_type="reopened")
+	assert len(storage.get_user_events(user_id="u1")) == 1
+
+
+def test_storage_init_db_migrates_old_transcripts(tmp_path, make_storage):
+	db_path = tmp_path / "var" / "db" / "app.db"
+	db_path.parent.mkdir(parents=True)
+	with sqlite3.connect(db_path) as conn:
+		conn.execute(
+			"CREATE TABLE transcripts (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+			"file_hash TEXT UNIQUE NOT NULL, language TEXT, text TEXT NOT NULL, "
+			"provider TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+		)
+	conn.close()
+
+	storage = make_storage()
+	storage.init_db()  # second run is a no-op
+	storage.save_transcript(
+		file_hash="h1", language="ru", text="t", provider="local", message_id=7, user_id="u1"
+	)
+	row = storage.get_transcript("h1")
+	assert row is not None
+	assert row["message_id"] == 7
+	assert row["user_id"] == "u1"
+
+
+def test_storage_user_history_queries_avoid_sort(storage):
+	queries = [
+		("SELECT * FROM messages WHERE user_id=? ORDER BY created_at DESC", ("u1",)),
+		("SELECT * FROM bot_responses WHERE user_id=? ORDER BY created_at DESC", ("u1",)),
+		("SELECT * FROM events WHERE user_id=? ORDER BY created_at DESC", ("u1",)),
+		(
+			"SELECT * FROM events WHERE user_id=? AND event_type=? ORDER BY created_at DESC",
+			("u1", "command_start"),
+		),
+	]
+	with storage._connect_log() as conn:
+		for sql, params in queries:
+			plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+			assert "USING INDEX" in plan
+			assert "TEMP B-TREE" not in plan
+
+
+def test_storage_moves_legacy_log_tables_to_log_db(storage):
+	storage.save_message(message_id=1, user_id="u1", chat_id="c1", message_type="text")
+	storage.save_event(message_id=1, user_id="u1", event_type="command_start")
+	storage.close()
+	# Simulate a database from before the split: log tables in the main DB only
+	with sqlite3.connect(storage.log_db_path) as log_conn:
+		log_conn.execute("ATTACH DATABASE ? AS main_db", (str(storage.db_path),))
+		for table in ("messages", "bot_responses", "events"):
+			log_conn.execute(f"CREATE TABLE main_db.{table} AS SELECT * FROM {table}")
+	log_conn.close()
+	storage.log_db_path.unlink()
+
+	storage.init_db()
+	storage.init_db()  # nothing left to move
+
+	assert len(storage.get_user_messages("u1")) == 1
+	assert len(storage.get_user_events("u1")) == 1
+	with storage._connect() as conn:
+		tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+	assert "messages" not in tables
+	assert "events" not in tables
+
+
+def test_storage_save_batch_bot_responses(storage):
+	storage.save_batch(
+		bot_responses=[
+			{
+				"message_id": 5,
+				"user_id": "u1",
+				"chat_id": "c1",
+				"response_type": "text",
+				"content": f"chunk {i}",
+			}
+			for i in range(3)
+		],
+	)
+
+	responses = storage.get_user_responses(user_id="u1", limit=10)
+	assert sorted(r["content"] for r in responses) == ["chunk 0", "chunk 1", "chunk 2"]
+
+
+def test_storage_rejects_log_db_same_as_main_db(tmp_path):
+	db_path = tmp_path / "var" / "db" / "app.db"
+	paths = Paths(
+		db_path=str(db_path),
+		log_db_path=str(tmp_path / "var" / "db" / ".." / "db" / "app.db"),
+	)
+	with pytest.raises(ValueError, match="log_db_path"):
+		Storage(AppConfig(paths=paths))
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+
+from src.core.write_buffer import AsyncWriteBuffer
+
+
+def _message_row(message_id: int) -> dict:
+	return {
+		"message_id": message_id,
+		"user_id": "u1",
+		"chat_id": "c1",
+		"message_type": "text",
+		"content": f"msg {message_id}",
+		"file_id": None,
+		"file_unique_id": None,
+		"filename": None,
+		"mime_type": None,
+	}
+
+
+def test_write_buffer_flushes_after_delay(storage):
+	async def run() -> None:
+		buffer = AsyncWriteBuffer(storage, max_batch=100, max_delay=0.01)
+		buffer.enqueue("messages", _message_row(1))
+		buffer.enqueue(
+			"events",
+			{"message_id": 1, "user_id": "u1", "event_type": "cmd_start", "details": None},
+		)
+		await asyncio.sleep(0.1)
+		assert len(storage.get_user_messages("u1")) == 1
+		assert len(storage.get_user_events("u1")) == 1
+		await buffer.close()
+
+	asyncio.run(run())
+
+
+def test_write_buffer_close_writes_pending_rows(storage):
+	async def run() -> None:
+		buffer = AsyncWriteBuffer(storage, max_batch=100, max_delay=60)
+		for i in range(3):
+			buffer.enqueue("messages", _message_row(i))
+		buffer.enqueue(
+			"bot_responses",
+			{
+				"message_id": 0,
+				"user_id": "u1",
+				"chat_id": "c1",
+				"response_type": "text",
+				"content": "hi",
+			},
+		)
+		await buffer.close()
+
+	asyncio.run(run())
+	assert len(storage.get_user_messages("u1")) == 3
+	assert len(storage.get_user_responses("u1")) == 1
+
+
+def test_write_buffer_drops_rows_after_close(storage, caplog):
+	async def run() -> None:
+		buffer = AsyncWriteBuffer(storage)
+		buffer.enqueue("messages", _message_row(1))
+		await buffer.close()
+		# A handler finishing during shutdown must not fail on its log rows
+		buffer.enqueue("messages", _message_row(2))
+
+	asyncio.run(run())
+	assert [m["message_id"] for m in storage.get_user_messages("u1")] == [1]
+	assert "dropping 1 messages row(s)" in caplog.text
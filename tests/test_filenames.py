@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from src.utils.filenames import file_ext
+
+
+def test_file_ext_returns_lowercase_last_extension():
+	assert file_ext("Voice.OGG") == "ogg"
+	assert file_ext("archive.tar.gz") == "gz"
+	assert file_ext("photos/file_1.jpg") == "jpg"
+
+
+def test_file_ext_default_when_no_dot():
+	assert file_ext("README") == ""
+	assert file_ext("README", "bin") == "bin"
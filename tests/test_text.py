@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from src.utils.text import split_text
+
+
+def test_split_text_breaks_between_words():
+	text = "alpha beta gamma delta epsilon"
+	chunks = split_text(text, 12)
+	assert chunks == ["alpha beta", "gamma delta", "epsilon"]
+	assert all(len(c) <= 12 for c in chunks)
+
+
+def test_split_text_cuts_words_longer_than_width():
+	assert split_text("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_split_text_merges_short_tail_within_max_len():
+	assert split_text("alpha beta gamma delta epsilon", 12, max_len=20) == [
+		"alpha beta",
+		"gamma delta epsilon",
+	]
+
+
+def test_split_text_keeps_short_and_blank_text():
+	assert split_text("hello", 100) == ["hello"]
+	assert split_text("   ", 100) == ["   "]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -205,3 +206,117 @@ def test_transcription_router_merges_chunk_segments(tmp_path, monkeypatch):
 	assert stored is not None
 	assert stored["text"] == "hello world"
 
+
+def _patch_chunked_audio(
+	tmp_path: Path, monkeypatch, cfg: AppConfig, name: str, count: int
+) -> tuple[Path, list[Path]]:
+	"""Create source audio and stub its normalization and split into count chunk files."""
+	src_audio = tmp_path / f"{name}.ogg"
+	src_audio.write_bytes(b"src")
+	norm_wav = Path(cfg.paths.cache_dir) / f"{name}_16k_mono.wav"
+	norm_wav.parent.mkdir(parents=True, exist_ok=True)
+	norm_wav.write_bytes(b"norm")
+	chunks = [tmp_path / f"chunk_{i}.wav" for i in range(count)]
+	for i, chunk in enumerate(chunks):
+		chunk.write_bytes(bytes([i]))
+
+	monkeypatch.setattr(
+		"src.transcription.router.ensure_wav_16k_mono",
+		lambda *_args, **_kwargs: norm_wav,
+	)
+	monkeypatch.setattr(
+		"src.transcription.router.segment_wav_by_time",
+		lambda *_args, **_kwargs: chunks,
+	)
+	return src_audio, chunks
+
+
+class _ChunkCloudProvider:
+	"""Cloud stub answering "cloud<i>" for chunk i; records the chunk indexes it got."""
+
+	def __init__(self, chunks: list[Path]):
+		self.config = SimpleNamespace(cloud=SimpleNamespace(model="gpt-test"))
+		self.chunks = chunks
+		self.calls: list[int] = []
+
+	def transcribe(self, wav_path):
+		index = self.chunks.index(wav_path)
+		self.calls.append(index)
+		return TranscriptionResult(text=f"cloud{index}", language="en", segments=[], provider="")
+
+
+def _use_providers(monkeypatch, local, cloud) -> None:
+	monkeypatch.setattr(TranscriptionRouter, "_get_local", lambda self: local)
+	monkeypatch.setattr(TranscriptionRouter, "_get_cloud", lambda self: cloud)
+
+
+def test_transcription_router_reports_each_chunk_once_across_fallback(tmp_path, monkeypatch):
+	cfg = _make_config(tmp_path)
+	storage = _prepare_storage(cfg)
+	src_audio, chunks = _patch_chunked_audio(tmp_path, monkeypatch, cfg, "long", 3)
+	norm_wav = Path(cfg.paths.cache_dir) / "long_16k_mono.wav"
+	monkeypatch.setattr(
+		TranscriptionRouter,
+		"_run_with_timeout",
+		lambda self, func, *, timeout: func(),
+	)
+
+	class LocalProvider:
+		def transcribe(self, wav_path):
+			if wav_path == chunks[1]:
+				raise RuntimeError("fail")
+			return TranscriptionResult(text="local", language="en", segments=[], provider="")
+
+	cloud_provider = _ChunkCloudProvider(chunks)
+	_use_providers(monkeypatch, LocalProvider(), cloud_provider)
+
+	parts: list[str] = []
+	router = TranscriptionRouter(config=cfg)
+	result = router.transcribe(src_audio, on_part=parts.append)
+
+	# The fallback resumes after the reported chunk: the result is what was reported
+	assert parts == ["local", "cloud1", "cloud2"]
+	assert cloud_provider.calls == [1, 2]
+	assert result.text == "local cloud1 cloud2"
+	assert storage.get_transcript(sha256_of_file(norm_wav))["text"] == "local cloud1 cloud2"
+
+
+def test_transcription_router_timed_out_attempt_stops_reporting(tmp_path, monkeypatch):
+	cfg = _make_config(tmp_path)
+	_prepare_storage(cfg)
+	src_audio, chunks = _patch_chunked_audio(tmp_path, monkeypatch, cfg, "slow", 3)
+
+	release_local = threading.Event()
+	local_calls: list[int] = []
+	local_threads: list[threading.Thread] = []
+
+	class SlowLocalProvider:
+		def transcribe(self, wav_path):
+			index = chunks.index(wav_path)
+			local_calls.append(index)
+			if index == 1:
+				local_threads.append(threading.current_thread())
+				# Outlives the 1 s local timeout
+				release_local.wait(timeout=10)
+			return TranscriptionResult(
+				text=f"local{index}", language="en", segments=[], provider=""
+			)
+
+	cloud_provider = _ChunkCloudProvider(chunks)
+	_use_providers(monkeypatch, SlowLocalProvider(), cloud_provider)
+
+	parts: list[str] = []
+	router = TranscriptionRouter(config=cfg)
+	result = router.transcribe(src_audio, on_part=parts.append)
+
+	assert cloud_provider.calls == [1, 2]
+	assert result.text == "local0 cloud1 cloud2"
+	assert parts == ["local0", "cloud1", "cloud2"]
+
+	# The timed-out local thread finishes chunk 1 later: it is not reported and the
+	# thread stops there instead of transcribing the remaining chunks
+	release_local.set()
+	local_threads[0].join(timeout=5)
+	assert not local_threads[0].is_alive()
+	assert local_calls == [0, 1]
+	assert parts == ["local0", "cloud1", "cloud2"]